@@ -122,6 +122,30 @@ except Exception as e:
     logger.error("[Scheduler] Failed to start: %s", e)
  
  
+# -------------------- Worker threads -------------------- #
+# Every router is a sync `def` handler on a sync Session, so requests run on
+# AnyIO's default thread limiter. Keep it no larger than the DB pool so threads
+# can't pile up behind connections they are themselves blocking.
+@app.on_event("startup")
+async def _size_worker_threads():
+    import anyio.to_thread
+    limit = getattr(settings, "DB_POOL_SIZE", 20) + getattr(settings, "DB_MAX_OVERFLOW", 10)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = limit
+    logger.info("[Threads] Worker thread limit set to %s (matches DB pool).", limit)
+ 
+ 
+# -------------------- System user -------------------- #
+# Resolve the System user once per worker at boot; the inbox router memoizes its id,
+# so request handlers never look it up.
+@app.on_event("startup")
+def _prime_system_user():
+    try:
+        with SessionLocal() as db:
+            inbox.get_system_user_id(db)
+    except Exception as e:
+        logger.error("[SystemUser] Failed to prime: %s", e)
+ 
+ 
 # -------------------- Middleware -------------------- #
 _allowed = {
     "http://localhost:5173",
@@ -140,6 +164,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
  
 # -------------------- Health / Introspection -------------------- #
@@ -0,0 +1,26 @@
+"""Index conversation_users by conversation
+
+Revision ID: conversation_users_conversation_index
+Revises: inbox_message_timestamp_default
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "conversation_users_conversation_index"
+down_revision = "inbox_message_timestamp_default"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # uq_conv_user leads with user_id; member lists and "any members left?"
+    # probes filter on conversation_id alone.
+    op.create_index(
+        "ix_conversation_users_conversation_id",
+        "conversation_users",
+        ["conversation_id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_conversation_users_conversation_id", table_name="conversation_users")
@@ -0,0 +1,39 @@
+"""Store each DM participant's peer on conversation_users
+
+Revision ID: conversation_users_peer
+Revises: conversation_users_conversation_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "conversation_users_peer"
+down_revision = "conversation_users_conversation_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("conversation_users", sa.Column("peer_user_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "conversation_users_peer_user_id_fkey",
+        "conversation_users", "users",
+        ["peer_user_id"], ["id"],
+        ondelete="SET NULL",
+    )
+    # Backfill existing DMs: the peer is the other member of the dm:* conversation.
+    op.execute(
+        """
+        UPDATE conversation_users cu SET peer_user_id = other.user_id
+        FROM conversations c, conversation_users other
+        WHERE c.id = cu.conversation_id
+          AND c.name LIKE 'dm:%'
+          AND other.conversation_id = cu.conversation_id
+          AND other.user_id <> cu.user_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_constraint("conversation_users_peer_user_id_fkey", "conversation_users", type_="foreignkey")
+    op.drop_column("conversation_users", "peer_user_id")
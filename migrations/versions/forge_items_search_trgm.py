@@ -0,0 +1,30 @@
+"""Trigram GIN index for forge_items text search
+
+Revision ID: forge_items_search_trgm
+Revises: unique_conversation_name
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "forge_items_search_trgm"
+down_revision = "unique_conversation_name"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Expression must stay in sync with _ITEM_SEARCH_EXPR in routers/forge.py.
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS forge_items_search_trgm ON forge_items
+        USING gin ((
+            lower(title) || ' ' || coalesce(lower(body), '') || ' ' ||
+            coalesce(lower(tags), '') || ' ' || coalesce(lower(location), '')
+        ) gin_trgm_ops)
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS forge_items_search_trgm")
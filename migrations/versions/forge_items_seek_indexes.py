@@ -0,0 +1,29 @@
+"""Composite indexes for keyset pagination of forge_items
+
+Revision ID: forge_items_seek_indexes
+Revises: forge_items_search_trgm
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "forge_items_seek_indexes"
+down_revision = "forge_items_search_trgm"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One per list_items sort; both end in id so cursor seeks are unique.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_forge_items_new_seek "
+        "ON forge_items (created_at DESC, id DESC)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_forge_items_top_seek "
+        "ON forge_items (votes_count DESC, created_at DESC, id DESC)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_forge_items_top_seek")
+    op.execute("DROP INDEX IF EXISTS ix_forge_items_new_seek")
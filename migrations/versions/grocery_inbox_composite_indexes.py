@@ -0,0 +1,32 @@
+"""Composite indexes for grocery item and conversation message lookups
+
+Revision ID: grocery_inbox_composite_indexes
+Revises: unique_food_inventory_name
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "grocery_inbox_composite_indexes"
+down_revision = "unique_food_inventory_name"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Grocery routes filter items by list, usually with checked = true.
+    op.create_index(
+        "ix_grocery_items_list_checked",
+        "grocery_items",
+        ["grocery_list_id", "checked"],
+    )
+    # Message threads are read per conversation ordered by (timestamp, id).
+    op.create_index(
+        "ix_inbox_conv_ts",
+        "inbox_messages",
+        ["conversation_id", "timestamp", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_inbox_conv_ts", table_name="inbox_messages")
+    op.drop_index("ix_grocery_items_list_checked", table_name="grocery_items")
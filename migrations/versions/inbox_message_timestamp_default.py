@@ -0,0 +1,35 @@
+"""Stamp inbox message timestamps on the server
+
+Revision ID: inbox_message_timestamp_default
+Revises: grocery_inbox_composite_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "inbox_message_timestamp_default"
+down_revision = "grocery_inbox_composite_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # normalize existing data (safe even if none are NULL)
+    # the column is naive and has always held UTC (datetime.utcnow), so stamp
+    # UTC regardless of the session's TimeZone setting
+    op.execute("UPDATE inbox_messages SET timestamp = timezone('utc', now()) WHERE timestamp IS NULL;")
+    op.alter_column(
+        "inbox_messages", "timestamp",
+        existing_type=sa.DateTime(),
+        nullable=False,
+        server_default=sa.text("timezone('utc', now())"),
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "inbox_messages", "timestamp",
+        existing_type=sa.DateTime(),
+        nullable=True,
+        server_default=None,
+    )
@@ -0,0 +1,76 @@
+"""Make conversations.name unique (enables ON CONFLICT (name) upserts)
+
+Revision ID: unique_conversation_name
+Revises: 5d3g808e69b4
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "unique_conversation_name"
+down_revision = "5d3g808e69b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Legacy per-user System conversations are all literally named 'System', so
+    # they must not be folded together (that would hand every user everyone
+    # else's System thread). Give each one its per-user key instead; a user's
+    # own duplicates then merge below, which is harmless. A 'System' row with
+    # no single non-system member can't be attributed and keeps a unique name.
+    op.execute(
+        """
+        UPDATE conversations c SET name = 'system:' || m.user_id
+        FROM (
+            SELECT cu.conversation_id, MIN(cu.user_id) AS user_id
+            FROM conversation_users cu JOIN users u ON u.id = cu.user_id
+            WHERE u.email <> 'system@domain.com'
+            GROUP BY cu.conversation_id
+            HAVING COUNT(*) = 1
+        ) m
+        WHERE c.name = 'System' AND c.id = m.conversation_id
+        """
+    )
+    op.execute("UPDATE conversations SET name = 'system-legacy:' || id WHERE name = 'System'")
+
+    # Every other name is shared by design ('idea:…', 'problem:…', 'feedback')
+    # or already per-participant ('system:{uid}', 'dm:{a}:{b}'), so fold any
+    # duplicates into the oldest one.
+    op.execute(
+        """
+        CREATE TEMP TABLE _conv_dupes ON COMMIT DROP AS
+        SELECT c.id AS dup_id, k.keep_id
+        FROM conversations c
+        JOIN (
+            SELECT name, MIN(id) AS keep_id
+            FROM conversations
+            WHERE name IS NOT NULL
+            GROUP BY name
+            HAVING COUNT(*) > 1
+        ) k ON k.name = c.name AND c.id <> k.keep_id
+        """
+    )
+    for table in ("inbox_messages", "problems", "solutions"):
+        op.execute(
+            f"""
+            UPDATE {table} t SET conversation_id = d.keep_id
+            FROM _conv_dupes d WHERE t.conversation_id = d.dup_id
+            """
+        )
+    op.execute(
+        """
+        INSERT INTO conversation_users (user_id, conversation_id)
+        SELECT cu.user_id, d.keep_id
+        FROM conversation_users cu JOIN _conv_dupes d ON cu.conversation_id = d.dup_id
+        ON CONFLICT ON CONSTRAINT uq_conv_user DO NOTHING
+        """
+    )
+    op.execute("DELETE FROM conversations WHERE id IN (SELECT dup_id FROM _conv_dupes)")
+
+    op.drop_index("ix_conversations_name", table_name="conversations")
+    op.create_index("ix_conversations_name", "conversations", ["name"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_conversations_name", table_name="conversations")
+    op.create_index("ix_conversations_name", "conversations", ["name"], unique=False)
@@ -0,0 +1,44 @@
+"""Unique food_inventory (user_id, name) for inventory upserts
+
+Revision ID: unique_food_inventory_name
+Revises: forge_items_seek_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "unique_food_inventory_name"
+down_revision = "forge_items_seek_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fold duplicate names into the oldest row, summing quantities.
+    op.execute(
+        """
+        WITH d AS (
+            SELECT user_id, name, MIN(id) AS keep_id,
+                   SUM(quantity) AS quantity, MAX(desired_quantity) AS desired_quantity
+            FROM food_inventory
+            GROUP BY user_id, name
+            HAVING COUNT(*) > 1
+        )
+        UPDATE food_inventory f
+        SET quantity = d.quantity, desired_quantity = d.desired_quantity
+        FROM d WHERE f.id = d.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM food_inventory f
+        USING food_inventory k
+        WHERE f.user_id = k.user_id AND f.name = k.name AND f.id > k.id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_food_inventory_user_name", "food_inventory", ["user_id", "name"]
+    )
+
+
+def downgrade():
+    op.drop_constraint("uq_food_inventory_user_name", "food_inventory", type_="unique")
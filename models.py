@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Table, Boolean, Float, func, JSON, Date, UniqueConstraint, text
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Table, Boolean, Float, func, JSON, Date, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.ext.associationproxy import association_proxy
@@ -69,6 +69,7 @@ class User(Base):
     conversation_users = relationship(
         "ConversationUser",
         back_populates="user",
+        foreign_keys="ConversationUser.user_id",
         cascade="all, delete-orphan",
     )
     conversations = association_proxy("conversation_users", "conversation")
@@ -120,6 +121,8 @@ class FoodInventory(Base):
     desired_quantity = Column(Integer, nullable=False, default=0)
     categories = Column(Text, nullable=True)
 
+    __table_args__ = (UniqueConstraint("user_id", "name", name="uq_food_inventory_user_name"),)
+
     user = relationship("User", back_populates="food_inventory")
 
 
@@ -155,6 +158,8 @@ class GroceryItem(Base):
 
     grocery_list = relationship("GroceryList", back_populates="items")
 
+    __table_args__ = (Index("ix_grocery_items_list_checked", "grocery_list_id", "checked"),)
+
 
 class TranscriptionUsage(Base):
     __tablename__ = "transcription_usage"
@@ -507,12 +512,15 @@ class InboxMessage(Base):
     content = Column(Text, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"))
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    # naive UTC, like the datetime.utcnow values written before this default
+    timestamp = Column(DateTime, nullable=False, server_default=text("timezone('utc', now())"))
     read = Column(Boolean, default=False)
 
     user = relationship("User", back_populates="inbox_messages")
     conversation = relationship("Conversation", back_populates="messages")
 
+    __table_args__ = (Index("ix_inbox_conv_ts", "conversation_id", "timestamp", "id"),)
+
     def __repr__(self):
         return f"<InboxMessage(id={self.id}, content={self.content[:20]}..., timestamp={self.timestamp}, read={self.read})>"
 
@@ -521,7 +529,7 @@ class Conversation(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    name = Column(String, index=True)
+    name = Column(String, unique=True, index=True)
 
     messages = relationship("InboxMessage", back_populates="conversation")
 
@@ -543,11 +551,16 @@ class ConversationUser(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
+    # DMs only: the other participant, stored so summaries can join straight to them
+    peer_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
-    __table_args__ = (UniqueConstraint("user_id", "conversation_id", name="uq_conv_user"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "conversation_id", name="uq_conv_user"),
+        Index("ix_conversation_users_conversation_id", "conversation_id"),
+    )
 
     # ✅ These two lines are REQUIRED
-    user = relationship("User", back_populates="conversation_users")
+    user = relationship("User", back_populates="conversation_users", foreign_keys=[user_id])
     conversation = relationship("Conversation", back_populates="conversation_users")
     
 
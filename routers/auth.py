@@ -4,6 +4,7 @@ from datetime import timedelta, datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends, Security, Request, Response, UploadFile, File
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from models import Category, user_categories, User
+from routers.inbox import forget_user
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from schemas import UserResponse, UserCreate, ProfilePicUpdate, UsernameUpdate, AcceptTermsPayload
@@ -567,6 +568,7 @@ def update_username(
     current_user.username = payload.username
     db.commit()
     db.refresh(current_user)
+    forget_user(current_user.email)
     return {"username": current_user.username}
 
 @router.post("/account/upload-profile-pic")
@@ -679,9 +681,44 @@ def delete_account(
         )
         db.commit()
 
+    # Items this user pledged on (their pledges go away with the user cascade)
+    pledged_item_ids = [
+        row[0]
+        for row in db.execute(
+            text("SELECT DISTINCT item_id FROM forge_pledges WHERE user_id = :uid"),
+            {"uid": current_user.id},
+        )
+    ]
+
     # Delete the user — cascades handle everything else
+    email, user_id = current_user.email, current_user.id
     db.delete(current_user)
+    db.flush()
+
+    # Re-derive both pledge counters for the affected items in one scan + one write
+    if pledged_item_ids:
+        db.execute(
+            text("""
+                UPDATE forge_items fi
+                SET pledges_count = c.total,
+                    pledges_done  = c.done
+                FROM (
+                    SELECT i.id,
+                           COUNT(p.id) AS total,
+                           COUNT(p.id) FILTER (WHERE p.done) AS done
+                    FROM forge_items i
+                    LEFT JOIN forge_pledges p ON p.item_id = i.id
+                    WHERE i.id = ANY(:ids)
+                    GROUP BY i.id
+                ) c
+                WHERE fi.id = c.id
+            """),
+            {"ids": pledged_item_ids},
+        )
     db.commit()
+    forget_user(email)  # else the inbox's email cache serves the dead id for a while
+    from routers.forum import forget_user_tokens  # forum imports this module
+    forget_user_tokens(user_id)
 
     # Clear auth cookies
     clear_cookie(response, "access_token")
@@ -2,13 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Path
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
-from datetime import datetime
 from models import BlogPost, BlogComment, User, InboxMessage
 from schemas import BlogPostCreate, BlogPostOut, BlogCommentCreate, BlogCommentOut
 from routers.auth import get_current_user_dependency  # Assuming you already use this
 from routers.inbox import (
-    get_or_create_system_user,
-    get_or_create_system_conversation_for_user,
+    get_system_user_id,
+    get_system_conversation_id,
     get_or_create_user_by_email_or_create,
     ADMIN_EMAIL,
 )
@@ -20,9 +19,9 @@ router = APIRouter(
 
 def notify_admin_of_blog_comment(db: Session, comment: BlogComment):
     # Ensure System user + Admin user + Admin's system convo
-    system_user = get_or_create_system_user(db)
+    system_user_id = get_system_user_id(db)
     admin_user = get_or_create_user_by_email_or_create(db, ADMIN_EMAIL, username="Admin")
-    convo = get_or_create_system_conversation_for_user(db, admin_user, system_user)
+    convo_id = get_system_conversation_id(db, admin_user)
 
     # Fetch post title and a safe author display (no public emails)
     post = db.query(BlogPost).filter(BlogPost.id == comment.post_id).first()
@@ -45,10 +44,9 @@ def notify_admin_of_blog_comment(db: Session, comment: BlogComment):
 
     # Drop it into Admin's system convo FROM System
     msg = InboxMessage(
-        user_id=system_user.id,
-        conversation_id=convo.id,
+        user_id=system_user_id,
+        conversation_id=convo_id,
         content=content,
-        timestamp=datetime.utcnow(),
     )
     db.add(msg)
     db.commit()
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from database import get_db
 from uuid import UUID
 from models import Community, CommunityMember, User, CommunityProject, CommunityProjectTask, CommunityChatMessage, Resource, CommunityEvent, InboxMessage
@@ -209,7 +209,6 @@ def request_to_join_community(
             inbox = InboxMessage(
                 user_id=creator_id,
                 content=content,
-                timestamp=datetime.utcnow()
             )
             db.add(inbox)
 
@@ -596,6 +595,7 @@ def get_messages(
     _, db = current
     messages = (
         db.query(CommunityChatMessage)
+        .options(selectinload(CommunityChatMessage.user))
         .filter(CommunityChatMessage.community_id == community_id)
         .order_by(CommunityChatMessage.timestamp.desc())
         .limit(50)
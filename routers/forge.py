@@ -1,13 +1,17 @@
 # routers/forge.py — Forge API (clean)
 from __future__ import annotations
 
+import threading
+import time
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field, ConfigDict, constr
-from sqlalchemy import func, text, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, delete, exists, func, insert, literal, select, text, tuple_, update
+from sqlalchemy.orm import Session, joinedload, load_only
 
 from database import get_db
 from routers.auth import get_current_user_dependency
@@ -34,8 +38,6 @@ from models import (
 
 router = APIRouter(prefix="/forge", tags=["forge"])
 
-SYSTEM_EMAIL = "system@domain.com"
-
 # --------------------------------------------------------------------------
 # Pydantic / DTOs
 # --------------------------------------------------------------------------
@@ -74,11 +76,155 @@ class PledgeIn(ORMBase):
 # Helpers (serialization, conversations, user)
 # --------------------------------------------------------------------------
 
+# Pre-built statements for the hot upsert/counter paths (built once at import,
+# so each call reuses the same statement object and its compiled form).
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_ITEM_CONVO_ID = select(Conversation.id).where(Conversation.name == bindparam("n"))
+# Only run when the lookup above misses. DO UPDATE is a no-op so RETURNING also
+# yields the id when a concurrent request created the row first.
+_SQL_ITEM_CONVO_UPSERT = text(
+    """
+    INSERT INTO conversations (name, created_at) VALUES (:n, timezone('utc', now()))
+    ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+    RETURNING id
+    """
+)
+# idempotent "join conversation"; also replaces SELECT-then-add membership probes
+_SQL_ITEM_CONVO_MEMBER = text(
+    """
+    INSERT INTO conversation_users (conversation_id, user_id)
+    VALUES (:c, :u)
+    ON CONFLICT ON CONSTRAINT uq_conv_user DO NOTHING
+    """
+)
+_SQL_ITEM_VOTES_RECOUNT = text(
+    """
+    UPDATE forge_items SET votes_count = (
+        SELECT COUNT(*) FROM forge_item_votes WHERE item_id = :id
+    ) WHERE id = :id
+    """
+)
+_SQL_ITEM_FOLLOWERS_RECOUNT = text(
+    """
+    UPDATE forge_items SET followers_count = (
+        SELECT COUNT(*) FROM forge_item_follows WHERE item_id = :id
+    ) WHERE id = :id
+    """
+)
+_SQL_ITEM_PLEDGES_DONE_RECOUNT = text(
+    """
+    UPDATE forge_items SET pledges_done = (
+        SELECT COUNT(*) FROM forge_pledges WHERE item_id = :id AND done = true
+    ) WHERE id = :id
+    """
+)
+# a new pledge is never done, so only the total moves
+_SQL_ITEM_PLEDGE_ADDED = text("UPDATE forge_items SET pledges_count = pledges_count + 1 WHERE id = :id")
+# :d is 1 if the removed pledge was done, else 0
+_SQL_ITEM_PLEDGE_REMOVED = text(
+    """
+    UPDATE forge_items
+    SET
+      pledges_count = GREATEST(pledges_count - 1, 0),
+      pledges_done  = GREATEST(pledges_done - :d, 0)
+    WHERE id = :id
+    """
+)
+_SQL_SOLUTION_VOTE_INSERT = text(
+    """
+    INSERT INTO solution_votes (solution_id, voter_identity, created_at)
+    VALUES (:s, :v, timezone('utc', now()))
+    ON CONFLICT ON CONSTRAINT uq_solution_vote_one DO NOTHING
+    RETURNING id
+    """
+)
+# solution vote counters move by delta (:d = votes removed), no recount scan
+_SQL_SOLUTION_VOTES_ADD = text("UPDATE solutions SET votes_count = votes_count + 1 WHERE id = :id")
+_SQL_SOLUTION_VOTES_SUB = text(
+    "UPDATE solutions SET votes_count = GREATEST(votes_count - :d, 0) WHERE id = :id"
+)
+
+# Columns the list view actually renders; `body` (up to 5000 chars) stays unloaded.
+_ITEM_SUMMARY_COLS = (
+    ForgeItem.id,
+    ForgeItem.kind,
+    ForgeItem.title,
+    ForgeItem.status,
+    ForgeItem.domain,
+    ForgeItem.scope,
+    ForgeItem.severity,
+    ForgeItem.location,
+    ForgeItem.tags,
+    ForgeItem.votes_count,
+    ForgeItem.followers_count,
+    ForgeItem.pledges_count,
+    ForgeItem.pledges_done,
+    ForgeItem.created_by_email,
+    ForgeItem.created_by_user_id,
+    ForgeItem.created_at,
+    ForgeItem.legacy_table,
+    ForgeItem.legacy_id,
+)
+
+# Must match the indexed expression in migration forge_items_search_trgm exactly.
+_ITEM_SEARCH_EXPR = (
+    "(lower(forge_items.title) || ' ' || coalesce(lower(forge_items.body), '') || ' ' || "
+    "coalesce(lower(forge_items.tags), '') || ' ' || coalesce(lower(forge_items.location), ''))"
+)
+
+# Short-lived cache of list_items pages keyed on the full query; forge item
+# mutations below clear it, the TTL bounds staleness from other writers.
+_LIST_CACHE_TTL = 5.0
+_LIST_CACHE_MAX = 2048
+_LIST_CACHE: Dict[tuple, tuple] = {}  # key -> (expires_at, items, next_cursor)
+_LIST_CACHE_LOCK = threading.Lock()
+
+# item id -> problem id for problem items; the link never changes once set, so
+# entries only go away when the item or problem is deleted.
+_PROBLEM_REF_CACHE_MAX = 10000
+_PROBLEM_REF_CACHE: Dict[int, int] = {}
+
+def _list_cache_get(key: tuple) -> Optional[tuple]:
+    hit = _LIST_CACHE.get(key)
+    if hit and hit[0] > time.monotonic():
+        return hit
+    return None
+
+def _list_cache_put(key: tuple, items: list, next_cursor: Optional[str]) -> None:
+    with _LIST_CACHE_LOCK:
+        if len(_LIST_CACHE) >= _LIST_CACHE_MAX:
+            _LIST_CACHE.pop(next(iter(_LIST_CACHE)))  # drop oldest entry
+        _LIST_CACHE[key] = (time.monotonic() + _LIST_CACHE_TTL, items, next_cursor)
+
+def _list_cache_clear() -> None:
+    with _LIST_CACHE_LOCK:
+        _LIST_CACHE.clear()
+
+def _encode_cursor(i: ForgeItem, sort: str) -> str:
+    """Opaque keyset cursor for the last row of a list_items page."""
+    key = [i.created_at.isoformat(), str(i.id)]
+    if sort == "top":
+        key.insert(0, str(i.votes_count or 0))
+    return "|".join(key)
+
+def _decode_cursor(after: str, sort: str) -> tuple:
+    parts = after.split("|")
+    try:
+        if sort == "top":
+            vc, ca, iid = parts
+            return int(vc), datetime.fromisoformat(ca), int(iid)
+        ca, iid = parts
+        return datetime.fromisoformat(ca), int(iid)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
 def _val(x):
     """Return enum.value or primitive as-is (prevents [object Object] in JSON)."""
-    return getattr(x, "value", x)
+    # isinstance is cheaper than getattr-with-default, which raises internally for str/None
+    return x.value if isinstance(x, Enum) else x
 
-def _serialize_item(i: ForgeItem, db: Session = None) -> dict:
+def _serialize_item_summary(i: ForgeItem, db: Session = None) -> dict:
+    """Card-sized item payload (no body); safe for rows loaded with _ITEM_SUMMARY_COLS."""
     username = None
     if db and i.created_by_email:
         u = db.query(User).filter(User.email == i.created_by_email).first()
@@ -87,10 +233,9 @@ def _serialize_item(i: ForgeItem, db: Session = None) -> dict:
 
     return {
         "id": i.id,
-        "kind": i.kind.value if hasattr(i.kind, "value") else i.kind,
+        "kind": _val(i.kind),
         "title": i.title,
-        "body": i.body,
-        "status": i.status.value if hasattr(i.status, "value") else i.status,
+        "status": _val(i.status),
         "domain": i.domain,
         "scope": i.scope,
         "severity": i.severity,
@@ -105,44 +250,34 @@ def _serialize_item(i: ForgeItem, db: Session = None) -> dict:
         "created_at": i.created_at,
     }
 
-def get_or_create_system_user(db: Session) -> User:
-    sys = db.query(User).filter(User.email == SYSTEM_EMAIL).first()
-    if sys:
-        return sys
-    sys = User(email=SYSTEM_EMAIL, username="System")
-    db.add(sys)
-    db.commit()
-    db.refresh(sys)
-    return sys
+def _serialize_item(i: ForgeItem, db: Session = None) -> dict:
+    out = _serialize_item_summary(i, db)
+    out["body"] = i.body
+    return out
 
-def ensure_item_conversation(db: Session, item: ForgeItem) -> Conversation:
+def ensure_item_conversation(db: Session, item: ForgeItem) -> int:
+    """Upsert the item's conversation (+ creator membership); returns the conversation id."""
     canonical = f"forge:item:{item.id}"
-    convo = db.query(Conversation).filter(Conversation.name == canonical).first()
-    if not convo:
-        convo = Conversation(name=canonical)
-        db.add(convo)
-        db.flush()
+    # Plain lookup first: the GET routes call this on every request, and the
+    # upsert would write a new row version and take a row lock each time.
+    convo_id = db.execute(_ITEM_CONVO_ID, {"n": canonical}).scalar_one_or_none()
+    wrote = convo_id is None
+    if wrote:
+        convo_id = db.execute(_SQL_ITEM_CONVO_UPSERT, {"n": canonical}).scalar_one()
 
     if item.created_by_user_id:
-        present = (
-            db.query(ConversationUser)
-            .filter_by(conversation_id=convo.id, user_id=item.created_by_user_id)
-            .first()
-        )
-        if not present:
-            db.add(ConversationUser(conversation_id=convo.id, user_id=item.created_by_user_id))
+        joined = db.execute(_SQL_ITEM_CONVO_MEMBER, {"c": convo_id, "u": item.created_by_user_id})
+        wrote = wrote or joined.rowcount > 0
 
-    db.commit()
-    db.refresh(convo)
-    return convo
+    if wrote:
+        db.commit()
+    return convo_id
+
+def _disp(username: Optional[str]) -> str:
+    return username if (username and "@" not in username) else "User"
 
 def _serialize_msg(m: InboxMessage):
     u = getattr(m, "user", None)
-    def _disp(u: Optional[User]) -> str:
-        if not u:
-            return "User"
-        name = getattr(u, "username", None) or getattr(u, "display_name", None) or ""
-        return name if (name and "@" not in name) else "User"
     return {
         "id": m.id,
         "content": m.content,
@@ -151,9 +286,40 @@ def _serialize_msg(m: InboxMessage):
         "from_email": getattr(u, "email", None),
         "from_username": getattr(u, "username", None),
         "from_user_id": getattr(u, "id", None),
-        "from_display": _disp(u),
+        "from_display": _disp(getattr(u, "username", None)),
     }
 
+def _list_conversation_messages(db: Session, convo_id: int) -> List[dict]:
+    """Thread messages as plain dicts; selects only the sender columns we render."""
+    rows = (
+        db.query(
+            InboxMessage.id,
+            InboxMessage.content,
+            InboxMessage.timestamp,
+            InboxMessage.read,
+            User.email,
+            User.username,
+            User.id.label("user_id"),
+        )
+        .outerjoin(User, User.id == InboxMessage.user_id)
+        .filter(InboxMessage.conversation_id == convo_id)
+        .order_by(InboxMessage.timestamp.asc(), InboxMessage.id.asc())
+        .all()
+    )
+    return [
+        {
+            "id": r.id,
+            "content": r.content,
+            "timestamp": r.timestamp,
+            "read": bool(r.read),
+            "from_email": r.email,
+            "from_username": r.username,
+            "from_user_id": r.user_id,
+            "from_display": _disp(r.username),
+        }
+        for r in rows
+    ]
+
 def _optional_user_from_header(request: Request, db: Session) -> Optional[User]:
     email = (request.headers.get("x-user-email") or "").strip()
     if not email:
@@ -172,27 +338,110 @@ def _get_solution_or_404(db: Session, solution_id: int) -> Solution:
         raise HTTPException(404, "Solution not found")
     return obj
 
-def _get_problem_note_or_404(db: Session, note_id: int) -> ProblemNote:
-    obj = db.query(ProblemNote).filter(ProblemNote.id == note_id).first()
-    if not obj:
-        raise HTTPException(404, "Problem note not found")
-    return obj
+def _assert_problem_exists(db: Session, problem_id: int) -> None:
+    """404 guard for write paths that only need the FK target to exist."""
+    if db.execute(select(literal(1)).where(Problem.id == problem_id)).first() is None:
+        raise HTTPException(404, "Problem not found")
+
+def _assert_solution_exists(db: Session, solution_id: int) -> None:
+    if db.execute(select(literal(1)).where(Solution.id == solution_id)).first() is None:
+        raise HTTPException(404, "Solution not found")
 
-def _get_solution_note_or_404(db: Session, note_id: int) -> SolutionNote:
-    obj = db.query(SolutionNote).filter(SolutionNote.id == note_id).first()
+def _patch_returning(db: Session, model, obj_id: int, values: dict, not_found: str):
+    """
+    PATCH helper: one UPDATE ... RETURNING instead of SELECT + dirty-flush +
+    post-commit refresh. With nothing to change it just loads the row.
+    """
+    if not values:
+        obj = db.get(model, obj_id)
+    else:
+        obj = db.execute(
+            update(model)
+            .where(model.id == obj_id)
+            .values(**values)
+            .returning(model)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
     if not obj:
-        raise HTTPException(404, "Solution note not found")
+        raise HTTPException(404, not_found)
     return obj
 
-def _inc_problem_notes_count(db: Session, problem_id: int, delta: int):
-    db.query(Problem).filter(Problem.id == problem_id).update(
-        {Problem.notes_count: Problem.notes_count + delta}
+def _insert_counted_note(db: Session, note_model, parent_model, parent_fk: str, values: dict):
+    """
+    Insert a note and bump its parent's notes_count in one statement
+    (INSERT in a CTE, UPDATE ... FROM it). Returns the note's id/timestamps.
+    """
+    new_note = (
+        insert(note_model)
+        .values(**values)
+        .returning(note_model.id, getattr(note_model, parent_fk),
+                   note_model.created_at, note_model.updated_at)
+        .cte("new_note")
+    )
+    return db.execute(
+        update(parent_model)
+        .where(parent_model.id == getattr(new_note.c, parent_fk))
+        .values(notes_count=parent_model.notes_count + 1)
+        .returning(new_note.c.id, new_note.c.created_at, new_note.c.updated_at)
+        .execution_options(synchronize_session=False)
+    ).one()
+
+def _delete_counted_note(db: Session, note_model, parent_model, parent_fk: str,
+                         note_id: int, not_found: str) -> None:
+    """Delete a note and decrement its parent's notes_count in one statement."""
+    gone = (
+        delete(note_model)
+        .where(note_model.id == note_id)
+        .returning(getattr(note_model, parent_fk))
+        .cte("gone")
     )
+    hit = db.execute(
+        update(parent_model)
+        .where(parent_model.id == getattr(gone.c, parent_fk))
+        .values(notes_count=parent_model.notes_count - 1)
+        .returning(parent_model.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not hit:
+        raise HTTPException(404, not_found)
 
-def _inc_solution_notes_count(db: Session, solution_id: int, delta: int):
-    db.query(Solution).filter(Solution.id == solution_id).update(
-        {Solution.notes_count: Solution.notes_count + delta}
+def _list_pledge_rows(db: Session, item_id: int, ident: str) -> List[dict]:
+    """
+    Pledges for an item with the pledger's email/username, selected as plain
+    columns (no User ORM hydration). `ident` must already be lowercased;
+    is_mine is computed in SQL.
+    """
+    is_mine = (func.lower(User.email) == ident) if ident else literal(False)
+    rows = (
+        db.query(
+            ForgePledge.id,
+            ForgePledge.text,
+            ForgePledge.done,
+            ForgePledge.done_at,
+            ForgePledge.created_at,
+            ForgePledge.user_id,
+            User.email,
+            User.username,
+            is_mine.label("is_mine"),
+        )
+        .outerjoin(User, User.id == ForgePledge.user_id)
+        .filter(ForgePledge.item_id == item_id)
+        .order_by(ForgePledge.created_at.asc(), ForgePledge.id.asc())
+        .all()
     )
+    return [
+        {
+            "id": r.id,
+            "text": r.text,
+            "done": bool(r.done),
+            "done_at": r.done_at,
+            "created_at": r.created_at,
+            "user_email": r.email,
+            "username": r.username,
+            "is_mine": bool(r.is_mine),
+        }
+        for r in rows
+    ]
 
 def _ensure_item_for_problem(db: Session, problem: Problem) -> ForgeItem:
     """
@@ -249,11 +498,13 @@ def _ensure_item_for_problem(db: Session, problem: Problem) -> ForgeItem:
 
 @router.get("/items")
 def list_items(
+    response: Response,
     db: Session = Depends(get_db),
     kind: Optional[str] = Query(None),                # "problem" | "idea"
     sort: str = Query("new", pattern="^(new|top)$"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    after: Optional[str] = Query(None),               # keyset cursor from X-Next-Cursor; overrides offset
     q: Optional[str] = Query(None),
     status: Optional[str] = Query(None),              # "open" | "in_progress" | ...
     domain: Optional[str] = None,
@@ -263,7 +514,18 @@ def list_items(
     severity_min: Optional[int] = Query(None, ge=1, le=5),
     severity_max: Optional[int] = Query(None, ge=1, le=5),
 ):
-    qry = db.query(ForgeItem)
+    cache_key = (
+        kind, sort, limit, offset, after, q, status, domain, scope,
+        location, tags, severity_min, severity_max,
+    )
+    hit = _list_cache_get(cache_key)
+    if hit:
+        _, out, next_cursor = hit
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return out
+
+    qry = db.query(ForgeItem).options(load_only(*_ITEM_SUMMARY_COLS))
 
     if kind:
         qry = qry.filter(ForgeItem.kind == ItemKind(kind))
@@ -282,29 +544,34 @@ def list_items(
     if severity_max is not None:
         qry = qry.filter(ForgeItem.severity <= severity_max)
     if q:
-        qlike = f"%{q.lower()}%"
-        qry = qry.filter(
-            or_(
-                func.lower(ForgeItem.title).ilike(qlike),
-                func.lower(ForgeItem.body).ilike(qlike),
-                func.lower(ForgeItem.tags).ilike(qlike),
-                func.lower(ForgeItem.location).ilike(qlike),
-            )
-        )
+        # Same substring match as before, but on the expression backed by the
+        # forge_items_search_trgm GIN index (see migration forge_items_search_trgm).
+        qry = qry.filter(text(f"{_ITEM_SEARCH_EXPR} LIKE :q")).params(q=f"%{q.lower()}%")
 
+    # Sort keys match the ix_forge_items_*_seek indexes; id breaks ties so cursors are stable.
     if sort == "new":
-        qry = qry.order_by(ForgeItem.created_at.desc())
+        sort_key = (ForgeItem.created_at, ForgeItem.id)
     else:
-        qry = qry.order_by(ForgeItem.votes_count.desc(), ForgeItem.created_at.desc())
+        sort_key = (ForgeItem.votes_count, ForgeItem.created_at, ForgeItem.id)
+    qry = qry.order_by(*(c.desc() for c in sort_key))
 
-    items = qry.offset(offset).limit(limit).all()
+    if after:
+        qry = qry.filter(tuple_(*sort_key) < tuple_(*_decode_cursor(after, sort)))
+    else:
+        qry = qry.offset(offset)
+
+    items = qry.limit(limit).all()
+    next_cursor = _encode_cursor(items[-1], sort) if len(items) == limit else None
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     out = []
     for i in items:
-        d = _serialize_item(i)
-        if i.kind == ItemKind.problem and getattr(i, "legacy_table", None) == "problems" and getattr(i, "legacy_id", None):
+        d = _serialize_item_summary(i)
+        if i.kind is ItemKind.problem and i.legacy_table == "problems" and i.legacy_id:
             d["problem_ref"] = {"id": i.legacy_id}
         out.append(d)
+    _list_cache_put(cache_key, out, next_cursor)
     return out
 
 @router.get("/items/{item_id}", response_model=None)
@@ -315,13 +582,27 @@ def get_item(item_id: int, request: Request, db: Session = Depends(get_db)):
 
     ident = (request.headers.get("x-user-email") or "").strip()
     has_voted = bool(
-        ident and db.query(ForgeItemVote.id).filter_by(item_id=item_id, voter_identity=ident).first()
+        ident
+        and db.scalar(
+            select(
+                exists().where(
+                    ForgeItemVote.item_id == item_id, ForgeItemVote.voter_identity == ident
+                )
+            )
+        )
     )
     has_followed = bool(
-        ident and db.query(ForgeItemFollow.id).filter_by(item_id=item_id, identity=ident).first()
+        ident
+        and db.scalar(
+            select(
+                exists().where(
+                    ForgeItemFollow.item_id == item_id, ForgeItemFollow.identity == ident
+                )
+            )
+        )
     )
 
-    convo = ensure_item_conversation(db, item)
+    convo_id = ensure_item_conversation(db, item)
     payload = _serialize_item(item)
 
     # username
@@ -341,7 +622,7 @@ def get_item(item_id: int, request: Request, db: Session = Depends(get_db)):
         {
             "has_voted": has_voted,
             "is_following": has_followed,
-            "conversation_id": convo.id if convo else None,
+            "conversation_id": convo_id,
         }
     )
     return payload
@@ -353,12 +634,33 @@ def create_item(
     db: Session = Depends(get_db),
 ):
     # unwrap kind safely whether dto.kind is an Enum or a str
-    kind_val = getattr(dto.kind, "value", dto.kind)
+    kind_val = _val(dto.kind)
 
-    # fetch full user to expose username in payload
-    author = db.query(User).filter(User.id == user.id).first()
+    # only the username is needed for the payload
+    username = db.query(User.username).filter(User.id == user.id).scalar()
 
-    # Create the ForgeItem
+    # If it’s a problem, create the Problem row first so the ForgeItem INSERT
+    # carries its legacy link (no follow-up UPDATE on forge_items).
+    legacy_table = legacy_id = None
+    if ItemKind(kind_val) == ItemKind.problem:
+        prob = Problem(
+            title=dto.title,
+            description=dto.body or "",
+            domain=dto.domain,
+            scope=dto.scope,
+            severity=dto.severity or 3,
+            status="Open",
+            created_by_email=getattr(user, "email", None),
+            created_at=datetime.utcnow(),
+            votes_count=0,
+            followers_count=0,
+            notes_count=0,
+        )
+        db.add(prob)
+        db.flush()  # INSERT ... RETURNING id
+        legacy_table, legacy_id = "problems", prob.id
+
+    # Create the ForgeItem; counters are set explicitly so nothing needs re-reading
     item = ForgeItem(
         kind=ItemKind(kind_val),
         title=dto.title,
@@ -372,38 +674,23 @@ def create_item(
         created_by_email=getattr(user, "email", None),
         created_by_user_id=getattr(user, "id", None),
         created_at=datetime.utcnow(),
+        votes_count=0,
+        followers_count=0,
+        pledges_count=0,
+        pledges_done=0,
+        legacy_table=legacy_table,
+        legacy_id=legacy_id,
     )
     db.add(item)
-    db.flush()  # get item.id
+    db.flush()  # INSERT ... RETURNING id
 
-    # If it’s a problem, also create a Problem row and link it
-    if item.kind == ItemKind.problem:
-        prob = Problem(
-            title=item.title,
-            description=item.body or "",
-            domain=item.domain,
-            scope=item.scope,
-            severity=item.severity or 3,
-            status="Open",
-            created_by_email=item.created_by_email,
-            created_at=datetime.utcnow(),
-            votes_count=0,
-            followers_count=0,
-            notes_count=0,
-        )
-        db.add(prob)
-        db.flush()
-        item.legacy_table = "problems"
-        item.legacy_id = prob.id
-
-    db.commit()
-    db.refresh(item)
-
-    # Build response (plain dict) and include username + problem_ref
+    # Build response (plain dict) before commit expires the instance, so no refresh
     out = _serialize_item(item)
-    out["created_by_username"] = getattr(author, "username", None)
-    if item.kind == ItemKind.problem and getattr(item, "legacy_id", None):
-        out["problem_ref"] = {"id": item.legacy_id}
+    out["created_by_username"] = username
+    if legacy_id:
+        out["problem_ref"] = {"id": legacy_id}
+    db.commit()
+    _list_cache_clear()
     return out
 
 @router.post("/items/{item_id}/vote")
@@ -420,17 +707,9 @@ def vote_item(
     if not exists:
         db.add(ForgeItemVote(item_id=item_id, voter_identity=identity))
         db.flush()
-        db.execute(
-            text(
-                """
-                UPDATE forge_items SET votes_count = (
-                    SELECT COUNT(*) FROM forge_item_votes WHERE item_id = :id
-                ) WHERE id = :id
-                """
-            ),
-            {"id": item_id},
-        )
+        db.execute(_SQL_ITEM_VOTES_RECOUNT, {"id": item_id})
         db.commit()
+        _list_cache_clear()
     return Ok()
 
 @router.delete("/items/{item_id}/vote")
@@ -441,17 +720,9 @@ def unvote_item(
 ):
     identity = user.email or f"anon:{user.id}"
     db.query(ForgeItemVote).filter_by(item_id=item_id, voter_identity=identity).delete()
-    db.execute(
-        text(
-            """
-            UPDATE forge_items SET votes_count = (
-                SELECT COUNT(*) FROM forge_item_votes WHERE item_id = :id
-            ) WHERE id = :id
-            """
-        ),
-        {"id": item_id},
-    )
+    db.execute(_SQL_ITEM_VOTES_RECOUNT, {"id": item_id})
     db.commit()
+    _list_cache_clear()
     return Ok()
 
 @router.post("/items/{item_id}/follow")
@@ -469,23 +740,13 @@ def follow_item(
     if not exists:
         db.add(ForgeItemFollow(item_id=item_id, identity=identity))
         db.flush()
-        db.execute(
-            text(
-                """
-                UPDATE forge_items SET followers_count = (
-                    SELECT COUNT(*) FROM forge_item_follows WHERE item_id = :id
-                ) WHERE id = :id
-                """
-            ),
-            {"id": item_id},
-        )
+        db.execute(_SQL_ITEM_FOLLOWERS_RECOUNT, {"id": item_id})
 
-    convo = ensure_item_conversation(db, item)
-    cu = db.query(ConversationUser).filter_by(conversation_id=convo.id, user_id=user.id).first()
-    if not cu:
-        db.add(ConversationUser(conversation_id=convo.id, user_id=user.id))
+    convo_id = ensure_item_conversation(db, item)
+    db.execute(_SQL_ITEM_CONVO_MEMBER, {"c": convo_id, "u": user.id})
 
     db.commit()
+    _list_cache_clear()
     return Ok()
 
 @router.delete("/items/{item_id}/follow")
@@ -500,22 +761,14 @@ def unfollow_item(
     identity = user.email or f"anon:{user.id}"
 
     db.query(ForgeItemFollow).filter_by(item_id=item_id, identity=identity).delete()
-    db.execute(
-        text(
-            """
-            UPDATE forge_items SET followers_count = (
-                SELECT COUNT(*) FROM forge_item_follows WHERE item_id = :id
-            ) WHERE id = :id
-            """
-        ),
-        {"id": item_id},
-    )
+    db.execute(_SQL_ITEM_FOLLOWERS_RECOUNT, {"id": item_id})
 
     convo = db.query(Conversation).filter(Conversation.name == f"forge:item:{item_id}").first()
     if convo and user.id and user.id != item.created_by_user_id:
         db.query(ConversationUser).filter_by(conversation_id=convo.id, user_id=user.id).delete()
 
     db.commit()
+    _list_cache_clear()
     return Ok()
 
 @router.post("/items/{item_id}/pledges")
@@ -529,17 +782,9 @@ def add_pledge(
         raise HTTPException(404, "Item not found")
     db.add(ForgePledge(item_id=item_id, user_id=user.id, text=dto.text))
     db.flush()
-    db.execute(
-        text(
-            """
-            UPDATE forge_items SET pledges_count = (
-                SELECT COUNT(*) FROM forge_pledges WHERE item_id = :id
-            ) WHERE id = :id
-            """
-        ),
-        {"id": item_id},
-    )
+    db.execute(_SQL_ITEM_PLEDGE_ADDED, {"id": item_id})
     db.commit()
+    _list_cache_clear()
     return Ok()
 
 @router.patch("/pledges/{pledge_id}/done")
@@ -557,17 +802,9 @@ def mark_pledge_done(
         p.done = True
         p.done_at = datetime.utcnow()
         db.flush()
-        db.execute(
-            text(
-                """
-                UPDATE forge_items SET pledges_done = (
-                    SELECT COUNT(*) FROM forge_pledges WHERE item_id = :id AND done = true
-                ) WHERE id = :id
-                """
-            ),
-            {"id": p.item_id},
-        )
+        db.execute(_SQL_ITEM_PLEDGES_DONE_RECOUNT, {"id": p.item_id})
         db.commit()
+        _list_cache_clear()
     return Ok()
 
 @router.get("/items/{item_id}/pledges")
@@ -576,32 +813,8 @@ def list_pledges(item_id: int, request: Request, db: Session = Depends(get_db)):
     if not item:
         raise HTTPException(404, "Item not found")
 
-    # Join with User to fetch username
-    pledges = (
-        db.query(ForgePledge)
-        .options(joinedload(ForgePledge.user))  # this ensures .user is loaded
-        .filter(ForgePledge.item_id == item_id)
-        .order_by(ForgePledge.created_at.asc(), ForgePledge.id.asc())
-        .all()
-    )
-
     ident = (request.headers.get("x-user-email") or "").strip().lower()
-
-    def row(p: ForgePledge) -> dict:
-        user_email = getattr(getattr(p, "user", None), "email", None)
-        username = getattr(getattr(p, "user", None), "username", None)
-        return {
-            "id": p.id,
-            "text": p.text,
-            "done": bool(p.done),
-            "done_at": p.done_at,
-            "created_at": p.created_at,
-            "user_email": user_email,
-            "username": username,
-            "is_mine": bool(ident and (user_email or "").lower() == ident),
-        }
-
-    return [row(p) for p in pledges]
+    return _list_pledge_rows(db, item_id, ident)
 
 @router.delete("/pledges/{pledge_id}")
 def delete_pledge(
@@ -621,24 +834,15 @@ def delete_pledge(
         raise HTTPException(403, "Only the pledge owner can delete")
 
     item_id = p.item_id
+    was_done = 1 if p.done else 0
 
     db.delete(p)
     db.flush()
 
-    # Recompute denorm counters on the ForgeItem
-    db.execute(
-        text(
-            """
-            UPDATE forge_items
-            SET
-              pledges_count = (SELECT COUNT(*) FROM forge_pledges WHERE item_id = :id),
-              pledges_done  = (SELECT COUNT(*) FROM forge_pledges WHERE item_id = :id AND done = true)
-            WHERE id = :id
-            """
-        ),
-        {"id": item_id},
-    )
+    # Adjust denorm counters on the ForgeItem by the removed pledge
+    db.execute(_SQL_ITEM_PLEDGE_REMOVED, {"id": item_id, "d": was_done})
     db.commit()
+    _list_cache_clear()
     return {"ok": True}
 
 # --------------------------------------------------------------------------
@@ -650,23 +854,17 @@ def get_item_conversation(item_id: int, db: Session = Depends(get_db)):
     item = db.get(ForgeItem, item_id)
     if not item:
         raise HTTPException(404, "Item not found")
-    convo = ensure_item_conversation(db, item)
-    return {"conversation_id": convo.id}
+    convo_id = ensure_item_conversation(db, item)
+    return {"conversation_id": convo_id}
 
-@router.get("/items/{item_id}/conversation/messages")
+@router.get("/items/{item_id}/conversation/messages", response_class=ORJSONResponse)
 def list_item_messages(item_id: int, db: Session = Depends(get_db)):
     item = db.get(ForgeItem, item_id)
     if not item:
         raise HTTPException(404, "Item not found")
-    convo = ensure_item_conversation(db, item)
-    msgs = (
-        db.query(InboxMessage)
-        .options(joinedload(InboxMessage.user))
-        .filter(InboxMessage.conversation_id == convo.id)
-        .order_by(InboxMessage.timestamp.asc(), InboxMessage.id.asc())
-        .all()
-    )
-    return [_serialize_msg(m) for m in msgs]
+    convo_id = ensure_item_conversation(db, item)
+    # Plain dicts straight to orjson, skipping jsonable_encoder
+    return ORJSONResponse(_list_conversation_messages(db, convo_id))
 
 @router.post("/items/{item_id}/conversation/send")
 def send_item_message(
@@ -680,24 +878,25 @@ def send_item_message(
 
     sender = payload.get("sender_email")
     content = payload.get("content", "")
-    user = db.query(User).filter(User.email == sender).first()
+    user = db.execute(_USER_BY_EMAIL, {"email": sender}).scalars().first()
     if not user:
         raise HTTPException(401, "Login required")
 
-    convo = ensure_item_conversation(db, item)
-    if not db.query(ConversationUser).filter_by(conversation_id=convo.id, user_id=user.id).first():
-        db.add(ConversationUser(conversation_id=convo.id, user_id=user.id))
+    convo_id = ensure_item_conversation(db, item)
+    db.execute(_SQL_ITEM_CONVO_MEMBER, {"c": convo_id, "u": user.id})
 
     msg = InboxMessage(
         user_id=user.id,
         content=content,
-        conversation_id=convo.id,
-        timestamp=datetime.utcnow(),
+        conversation_id=convo_id,
+        read=False,
     )
+    msg.user = user  # sender is already loaded; serializing must not lazy-load it again
     db.add(msg)
+    db.flush()  # assigns msg.id
+    out = {"message": _serialize_msg(msg)}
     db.commit()
-    db.refresh(msg)
-    return {"message": _serialize_msg(msg)}
+    return out
 
 # --------------------------------------------------------------------------
 # Problems: detail, notes, solutions (+ solution notes)
@@ -720,9 +919,29 @@ def get_problem(
     if not problem:
         raise HTTPException(404, "Problem not found")
 
-    creator_user = None
-    if problem.created_by_email:
-        creator_user = db.query(User).filter(User.email == problem.created_by_email).first()
+    # Solutions carry their has_voted flag in the same query (correlated EXISTS)
+    sols = []
+    if include_top_solutions:
+        ident = (request.headers.get("x-user-email") or "").strip()
+        voted = (
+            exists().where(SolutionVote.solution_id == Solution.id, SolutionVote.voter_identity == ident)
+            if ident
+            else literal(False)
+        )
+        sols = (
+            db.query(Solution, voted.label("has_voted"))
+            .filter(Solution.problem_id == problem_id)
+            .order_by(Solution.votes_count.desc(), Solution.created_at.desc())
+            .limit(top_n)
+            .all()
+        )
+
+    # One lookup for the creator's and all (non-anonymous) solution authors' usernames
+    emails = {problem.created_by_email} if problem.created_by_email else set()
+    emails.update(s.created_by_email for s, _ in sols if s.created_by_email and not s.anonymous)
+    usernames: Dict[str, Optional[str]] = {}
+    if emails:
+        usernames = dict(db.query(User.email, User.username).filter(User.email.in_(emails)).all())
 
     result = {
         "id": problem.id,
@@ -733,7 +952,7 @@ def get_problem(
         "severity": problem.severity,
         "status": _val(problem.status),
         "created_by_email": problem.created_by_email,
-        "created_by_username": getattr(creator_user, "username", None),
+        "created_by_username": usernames.get(problem.created_by_email),
         "created_at": problem.created_at,
         "votes_count": problem.votes_count,
         "followers_count": problem.followers_count,
@@ -754,28 +973,6 @@ def get_problem(
     }
 
     if include_top_solutions:
-        sols = (
-            db.query(Solution)
-            .filter(Solution.problem_id == problem_id)
-            .order_by(Solution.votes_count.desc(), Solution.created_at.desc())
-            .limit(top_n)
-            .all()
-        )
-
-        # Who am I (for has_voted)?
-        ident = (request.headers.get("x-user-email") or "").strip()
-        voted_ids: set[int] = set()
-        if ident and sols:
-            ids = [s.id for s in sols]
-            voted_ids = {
-                sid for (sid,) in db.query(SolutionVote.solution_id)
-                .filter(SolutionVote.voter_identity == ident, SolutionVote.solution_id.in_(ids))
-                .all()
-            }
-
-        def sol_user(s: Solution):
-            return db.query(User).filter(User.email == s.created_by_email).first() if s.created_by_email else None
-
         result["top_solutions"] = [
             {
                 "id": s.id,
@@ -785,16 +982,16 @@ def get_problem(
                 "status": _val(s.status),
                 "anonymous": s.anonymous,
                 "created_by_email": s.created_by_email,
-                "created_by_username": (getattr(sol_user(s), "username", None) if not s.anonymous else None),
+                "created_by_username": (usernames.get(s.created_by_email) if not s.anonymous else None),
                 "created_at": s.created_at,
                 "votes_count": s.votes_count,
                 "followers_count": s.followers_count,
                 "notes_count": s.notes_count,
                 "featured_in_forge": s.featured_in_forge,
                 "impact_score": s.impact_score,
-                "has_voted": (s.id in voted_ids),
+                "has_voted": bool(has_voted),
             }
-            for s in sols
+            for s, has_voted in sols
         ]
 
     return result
@@ -828,14 +1025,13 @@ def delete_problem(
         .first()
     )
     if fi:
-        db.query(ForgePledge).filter(ForgePledge.item_id == fi.id).delete(synchronize_session=False)
-        db.query(ForgeItemFollow).filter(ForgeItemFollow.item_id == fi.id).delete(synchronize_session=False)
-        db.query(ForgeItemVote).filter(ForgeItemVote.item_id == fi.id).delete(synchronize_session=False)
-        db.delete(fi)
+        _PROBLEM_REF_CACHE.pop(fi.id, None)
+        db.delete(fi)  # pledges/follows/votes go with it (ON DELETE CASCADE)
 
     # 4) Delete the problem (DB ON DELETE CASCADE handles solutions & notes)
     db.delete(prob)
     db.commit()
+    _list_cache_clear()
 
     return {"ok": True}
 
@@ -848,31 +1044,8 @@ def list_problem_pledges(
     problem = _get_problem_or_404(db, problem_id)
     item = _ensure_item_for_problem(db, problem)
 
-    pledges = (
-        db.query(ForgePledge)
-        .options(joinedload(ForgePledge.user))
-        .filter(ForgePledge.item_id == item.id)
-        .order_by(ForgePledge.created_at.asc(), ForgePledge.id.asc())
-        .all()
-    )
-
     ident = (request.headers.get("x-user-email") or "").strip().lower()
-
-    def row(p: ForgePledge) -> dict:
-        user_email = getattr(getattr(p, "user", None), "email", None)
-        username = getattr(getattr(p, "user", None), "username", None)
-        return {
-            "id": p.id,
-            "text": p.text,
-            "done": bool(p.done),
-            "done_at": p.done_at,
-            "created_at": p.created_at,
-            "user_email": user_email,
-            "username": username,
-            "is_mine": bool(ident and (user_email or "").lower() == ident),
-        }
-
-    return [row(p) for p in pledges]
+    return _list_pledge_rows(db, item.id, ident)
 
 
 @router.post("/problems/{problem_id}/pledges")
@@ -888,27 +1061,9 @@ def add_problem_pledge(
     db.add(ForgePledge(item_id=item.id, user_id=user.id, text=dto.text))
     db.flush()
     # keep ForgeItem denorm in sync
-    db.execute(
-        text(
-            """
-            UPDATE forge_items SET pledges_count = (
-                SELECT COUNT(*) FROM forge_pledges WHERE item_id = :id
-            ) WHERE id = :id
-            """
-        ),
-        {"id": item.id},
-    )
-    db.execute(
-        text(
-            """
-            UPDATE forge_items SET pledges_done = (
-                SELECT COUNT(*) FROM forge_pledges WHERE item_id = :id AND done = true
-            ) WHERE id = :id
-            """
-        ),
-        {"id": item.id},
-    )
+    db.execute(_SQL_ITEM_PLEDGE_ADDED, {"id": item.id})
     db.commit()
+    _list_cache_clear()
     return Ok()
 
 
@@ -933,29 +1088,26 @@ def create_problem_note(
     request: Request,
     db: Session = Depends(get_db),
 ):
-    _get_problem_or_404(db, problem_id)
+    _assert_problem_exists(db, problem_id)
     author = _optional_user_from_header(request, db)
-    note = ProblemNote(
+    row = _insert_counted_note(db, ProblemNote, Problem, "problem_id", dict(
         problem_id=problem_id,
         author_user_id=(author.id if author else None),
         title=payload.title,
         body=payload.body,
         is_public=payload.is_public,
         order_index=payload.order_index,
-    )
-    db.add(note)
-    _inc_problem_notes_count(db, problem_id, +1)
+    ))
     db.commit()
-    db.refresh(note)
     return {
-        "id": note.id,
-        "title": note.title,
-        "body": note.body,
-        "is_public": note.is_public,
-        "order_index": note.order_index,
-        "created_at": note.created_at,
-        "updated_at": note.updated_at,
-        "author_user_id": note.author_user_id,
+        "id": row.id,
+        "title": payload.title,
+        "body": payload.body,
+        "is_public": payload.is_public,
+        "order_index": payload.order_index,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "author_user_id": (author.id if author else None),
     }
 
 @router.patch("/problem-notes/{note_id}")
@@ -964,18 +1116,8 @@ def update_problem_note(
     payload: ProblemNoteUpdate,
     db: Session = Depends(get_db),
 ):
-    note = _get_problem_note_or_404(db, note_id)
-    if payload.title is not None:
-        note.title = payload.title
-    if payload.body is not None:
-        note.body = payload.body
-    if payload.is_public is not None:
-        note.is_public = payload.is_public
-    if payload.order_index is not None:
-        note.order_index = payload.order_index
-    db.commit()
-    db.refresh(note)
-    return {
+    note = _patch_returning(db, ProblemNote, note_id, payload.model_dump(exclude_none=True), "Problem note not found")
+    out = {
         "id": note.id,
         "title": note.title,
         "body": note.body,
@@ -985,16 +1127,15 @@ def update_problem_note(
         "updated_at": note.updated_at,
         "author_user_id": note.author_user_id,
     }
+    db.commit()
+    return out
 
 @router.delete("/problem-notes/{note_id}", status_code=204)
 def delete_problem_note(
     note_id: int,
     db: Session = Depends(get_db),
 ):
-    note = _get_problem_note_or_404(db, note_id)
-    pid = note.problem_id
-    db.delete(note)
-    _inc_problem_notes_count(db, pid, -1)
+    _delete_counted_note(db, ProblemNote, Problem, "problem_id", note_id, "Problem note not found")
     db.commit()
     return None
 
@@ -1019,10 +1160,10 @@ def create_solution(
     request: Request,
     db: Session = Depends(get_db),
 ):
-    _get_problem_or_404(db, problem_id)
+    _assert_problem_exists(db, problem_id)
     author = _optional_user_from_header(request, db)
     created_by_email = payload.created_by_email or (author.email if author else None)
-    sol = Solution(
+    values = dict(
         problem_id=problem_id,
         title=payload.title,
         description=payload.description,
@@ -1035,24 +1176,12 @@ def create_solution(
         featured_in_forge=False,
         impact_score=0.0,
     )
-    db.add(sol)
+    # INSERT ... RETURNING hands back the generated columns; no refresh SELECT
+    row = db.execute(
+        insert(Solution).values(**values).returning(Solution.id, Solution.created_at)
+    ).one()
     db.commit()
-    db.refresh(sol)
-    return {
-        "id": sol.id,
-        "problem_id": sol.problem_id,
-        "title": sol.title,
-        "description": sol.description,
-        "status": _val(sol.status),
-        "anonymous": sol.anonymous,
-        "created_by_email": sol.created_by_email,
-        "created_at": sol.created_at,
-        "votes_count": sol.votes_count,
-        "followers_count": sol.followers_count,
-        "notes_count": sol.notes_count,
-        "featured_in_forge": sol.featured_in_forge,
-        "impact_score": sol.impact_score,
-    }
+    return {"id": row.id, **values, "created_at": row.created_at}
 
 @router.patch("/solutions/{solution_id}")
 def patch_solution(
@@ -1060,20 +1189,11 @@ def patch_solution(
     payload: SolutionPatch,
     db: Session = Depends(get_db),
 ):
-    sol = _get_solution_or_404(db, solution_id)
-    if payload.title is not None:
-        sol.title = payload.title
-    if payload.description is not None:
-        sol.description = payload.description
-    if payload.status is not None:
-        sol.status = payload.status
-    if payload.featured_in_forge is not None:
-        sol.featured_in_forge = payload.featured_in_forge
-    if payload.impact_score is not None:
-        sol.impact_score = float(payload.impact_score)
-    db.commit()
-    db.refresh(sol)
-    return {
+    values = payload.model_dump(exclude_none=True)
+    if "impact_score" in values:
+        values["impact_score"] = float(values["impact_score"])
+    sol = _patch_returning(db, Solution, solution_id, values, "Solution not found")
+    out = {
         "id": sol.id,
         "problem_id": sol.problem_id,
         "title": sol.title,
@@ -1088,6 +1208,8 @@ def patch_solution(
         "featured_in_forge": sol.featured_in_forge,
         "impact_score": sol.impact_score,
     }
+    db.commit()
+    return out
 
 @router.delete("/solutions/{solution_id}")
 def delete_solution(
@@ -1122,20 +1244,12 @@ def vote_solution(
         raise HTTPException(404, "Solution not found")
 
     identity = user.email or f"anon:{user.id}"
-    exists = db.query(SolutionVote).filter_by(
-        solution_id=solution_id, voter_identity=identity
+    # race-free "vote once": a repeat vote hits uq_solution_vote_one and returns no row
+    inserted = db.execute(
+        _SQL_SOLUTION_VOTE_INSERT, {"s": solution_id, "v": identity}
     ).first()
-    if not exists:
-        db.add(SolutionVote(solution_id=solution_id, voter_identity=identity))
-        db.flush()
-        db.execute(
-            text("""
-                UPDATE solutions SET votes_count = (
-                  SELECT COUNT(*) FROM solution_votes WHERE solution_id = :id
-                ) WHERE id = :id
-            """),
-            {"id": solution_id},
-        )
+    if inserted:
+        db.execute(_SQL_SOLUTION_VOTES_ADD, {"id": solution_id})
         db.commit()
     return {"ok": True}
 
@@ -1146,25 +1260,21 @@ def unvote_solution(
     user: User = Depends(get_current_user_dependency),
     db: Session = Depends(get_db),
 ):
-    sol = db.get(Solution, solution_id)
-    if not sol:
-        raise HTTPException(404, "Solution not found")
-
     identity = user.email or f"anon:{user.id}"
-    db.query(SolutionVote).filter_by(
+    deleted = db.query(SolutionVote).filter_by(
         solution_id=solution_id, voter_identity=identity
-    ).delete()
-
-    db.execute(
-        text("""
-            UPDATE solutions SET votes_count = (
-              SELECT COUNT(*) FROM solution_votes WHERE solution_id = :id
-            ) WHERE id = :id
-        """),
-        {"id": solution_id},
-    )
+    ).delete(synchronize_session=False)
+
+    if not deleted:
+        # A vote row implies the solution exists, so only the no-op path
+        # needs the 404 check.
+        if db.get(Solution, solution_id) is None:
+            raise HTTPException(404, "Solution not found")
+        return {"ok": True, "changed": False}
+
+    db.execute(_SQL_SOLUTION_VOTES_SUB, {"id": solution_id, "d": deleted})
     db.commit()
-    return {"ok": True}
+    return {"ok": True, "changed": True}
 
 # Solution notes
 class SolutionNoteCreate(ORMBase):
@@ -1186,29 +1296,26 @@ def create_solution_note(
     request: Request,
     db: Session = Depends(get_db),
 ):
-    _get_solution_or_404(db, solution_id)
+    _assert_solution_exists(db, solution_id)
     author = _optional_user_from_header(request, db)
-    note = SolutionNote(
+    row = _insert_counted_note(db, SolutionNote, Solution, "solution_id", dict(
         solution_id=solution_id,
         author_user_id=(author.id if author else None),
         title=payload.title,
         body=payload.body,
         is_public=payload.is_public,
         order_index=payload.order_index,
-    )
-    db.add(note)
-    _inc_solution_notes_count(db, solution_id, +1)
+    ))
     db.commit()
-    db.refresh(note)
     return {
-        "id": note.id,
-        "title": note.title,
-        "body": note.body,
-        "is_public": note.is_public,
-        "order_index": note.order_index,
-        "created_at": note.created_at,
-        "updated_at": note.updated_at,
-        "author_user_id": note.author_user_id,
+        "id": row.id,
+        "title": payload.title,
+        "body": payload.body,
+        "is_public": payload.is_public,
+        "order_index": payload.order_index,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "author_user_id": (author.id if author else None),
     }
 
 @router.patch("/solution-notes/{note_id}")
@@ -1217,18 +1324,8 @@ def update_solution_note(
     payload: SolutionNoteUpdate,
     db: Session = Depends(get_db),
 ):
-    note = _get_solution_note_or_404(db, note_id)
-    if payload.title is not None:
-        note.title = payload.title
-    if payload.body is not None:
-        note.body = payload.body
-    if payload.is_public is not None:
-        note.is_public = payload.is_public
-    if payload.order_index is not None:
-        note.order_index = payload.order_index
-    db.commit()
-    db.refresh(note)
-    return {
+    note = _patch_returning(db, SolutionNote, note_id, payload.model_dump(exclude_none=True), "Solution note not found")
+    out = {
         "id": note.id,
         "title": note.title,
         "body": note.body,
@@ -1238,16 +1335,15 @@ def update_solution_note(
         "updated_at": note.updated_at,
         "author_user_id": note.author_user_id,
     }
+    db.commit()
+    return out
 
 @router.delete("/solution-notes/{note_id}", status_code=204)
 def delete_solution_note(
     note_id: int,
     db: Session = Depends(get_db),
 ):
-    note = _get_solution_note_or_404(db, note_id)
-    sid = note.solution_id
-    db.delete(note)
-    _inc_solution_notes_count(db, sid, -1)
+    _delete_counted_note(db, SolutionNote, Solution, "solution_id", note_id, "Solution note not found")
     db.commit()
     return None
 
@@ -1257,15 +1353,25 @@ def delete_solution_note(
 
 @router.get("/items/{item_id}/problem")
 def resolve_problem(item_id: int, db: Session = Depends(get_db)):
-    fi = db.query(ForgeItem).get(item_id)
-    if (
-        not fi
-        or fi.kind != ItemKind.problem
-        or fi.legacy_table != "problems"
-        or not fi.legacy_id
-    ):
-        raise HTTPException(404, "No problem mapping")
-    return {"id": fi.legacy_id}
+    problem_id = _PROBLEM_REF_CACHE.get(item_id)
+    if problem_id is None:
+        fi = (
+            db.query(ForgeItem.kind, ForgeItem.legacy_table, ForgeItem.legacy_id)
+            .filter(ForgeItem.id == item_id)
+            .first()
+        )
+        if (
+            not fi
+            or fi.kind != ItemKind.problem
+            or fi.legacy_table != "problems"
+            or not fi.legacy_id
+        ):
+            raise HTTPException(404, "No problem mapping")
+        problem_id = fi.legacy_id
+        if len(_PROBLEM_REF_CACHE) >= _PROBLEM_REF_CACHE_MAX:
+            _PROBLEM_REF_CACHE.clear()
+        _PROBLEM_REF_CACHE[item_id] = problem_id
+    return {"id": problem_id}
 
 @router.delete("/items/{item_id}")
 def delete_item(
@@ -1283,50 +1389,31 @@ def delete_item(
     if not (is_creator or is_shea):
         raise HTTPException(403, "Not authorized to delete this item")
 
-    # delete related problem if this item represents a problem
-    if item.kind == ItemKind.problem and getattr(item, "legacy_table", None) == "problems" and getattr(item, "legacy_id", None):
-        prob = db.query(Problem).filter(Problem.id == item.legacy_id).first()
-        if prob:
-            # delete solution notes
-            sols = db.query(Solution).filter(Solution.problem_id == prob.id).all()
-            for s in sols:
-                db.query(SolutionNote).filter(SolutionNote.solution_id == s.id).delete()
-            # delete solutions
-            db.query(Solution).filter(Solution.problem_id == prob.id).delete()
-            # delete problem notes
-            db.query(ProblemNote).filter(ProblemNote.problem_id == prob.id).delete()
-            # finally delete problem
-            db.delete(prob)
-
-    # delete item children
-    db.query(ForgePledge).filter_by(item_id=item_id).delete()
-    db.query(ForgeItemFollow).filter_by(item_id=item_id).delete()
-    db.query(ForgeItemVote).filter_by(item_id=item_id).delete()
+    # Pledges/votes/follows, and a mirrored problem's solutions (+ their notes) and
+    # notes, are removed by the FKs' ON DELETE CASCADE; the relationships use
+    # passive_deletes so the ORM doesn't pre-load them.
+    if item.kind == ItemKind.problem and item.legacy_table == "problems" and item.legacy_id:
+        db.query(Problem).filter(Problem.id == item.legacy_id).delete(synchronize_session=False)
 
     db.delete(item)
     db.commit()
+    _list_cache_clear()
+    _PROBLEM_REF_CACHE.pop(item_id, None)
     return {"ok": True}
 
 @router.get("/problems/{problem_id}/conversation")
 def get_problem_conversation(problem_id: int, db: Session = Depends(get_db)):
     problem = _get_problem_or_404(db, problem_id)
     item = _ensure_item_for_problem(db, problem)
-    convo = ensure_item_conversation(db, item)
-    return {"conversation_id": convo.id}
+    convo_id = ensure_item_conversation(db, item)
+    return {"conversation_id": convo_id}
 
-@router.get("/problems/{problem_id}/conversation/messages")
+@router.get("/problems/{problem_id}/conversation/messages", response_class=ORJSONResponse)
 def list_problem_messages(problem_id: int, db: Session = Depends(get_db)):
     problem = _get_problem_or_404(db, problem_id)
     item = _ensure_item_for_problem(db, problem)
-    convo = ensure_item_conversation(db, item)
-    msgs = (
-        db.query(InboxMessage)
-        .options(joinedload(InboxMessage.user))
-        .filter(InboxMessage.conversation_id == convo.id)
-        .order_by(InboxMessage.timestamp.asc(), InboxMessage.id.asc())
-        .all()
-    )
-    return [_serialize_msg(m) for m in msgs]
+    convo_id = ensure_item_conversation(db, item)
+    return ORJSONResponse(_list_conversation_messages(db, convo_id))
 
 @router.post("/problems/{problem_id}/conversation/send")
 def send_problem_message(
@@ -1339,21 +1426,22 @@ def send_problem_message(
 
     sender = payload.get("sender_email")
     content = payload.get("content", "")
-    user = db.query(User).filter(User.email == sender).first()
+    user = db.execute(_USER_BY_EMAIL, {"email": sender}).scalars().first()
     if not user:
         raise HTTPException(401, "Login required")
 
-    convo = ensure_item_conversation(db, item)
-    if not db.query(ConversationUser).filter_by(conversation_id=convo.id, user_id=user.id).first():
-        db.add(ConversationUser(conversation_id=convo.id, user_id=user.id))
+    convo_id = ensure_item_conversation(db, item)
+    db.execute(_SQL_ITEM_CONVO_MEMBER, {"c": convo_id, "u": user.id})
 
     msg = InboxMessage(
         user_id=user.id,
         content=content,
-        conversation_id=convo.id,
-        timestamp=datetime.utcnow(),
+        conversation_id=convo_id,
+        read=False,
     )
+    msg.user = user  # sender is already loaded; serializing must not lazy-load it again
     db.add(msg)
+    db.flush()  # assigns msg.id
+    out = {"message": _serialize_msg(msg)}
     db.commit()
-    db.refresh(msg)
-    return {"message": _serialize_msg(msg)}
\ No newline at end of file
+    return out
\ No newline at end of file
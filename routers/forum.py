@@ -1,18 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+import threading
+import time
+import jwt
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload, raiseload
 from models import Thread, Comment
 from schemas import ThreadCreate, CommentCreate, ThreadOut, CommentOut, UserResponse
 from database import get_db
-from typing import Optional, List
+from typing import Dict, Optional, List
 from routers.auth import decode_token_raw, get_current_user_dependency
 
 router = APIRouter()
 
+# Decoded bearer tokens, so repeat forum requests skip the JWT verify and the
+# user lookup. An entry never outlives the token's own exp; delete_account drops
+# the user's entries here, other workers keep them for at most the TTL.
+_TOKEN_CACHE_TTL = 60.0
+_TOKEN_CACHE_MAX = 20000
+_TOKEN_CACHE: Dict[str, tuple] = {}  # token -> (expires_at, user)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Rendered GET /threads body. Thread and comment writes below drop it; the TTL
+# bounds staleness from other workers.
+_THREADS_CACHE_TTL = 15.0
+_THREADS_CACHE: Optional[tuple] = None  # (expires_at, json bytes)
+_THREADS_ADAPTER = TypeAdapter(List[ThreadOut])
+
+def _threads_cache_clear() -> None:
+    global _THREADS_CACHE
+    _THREADS_CACHE = None
+
+def _token_cache_deadline(token: str) -> float:
+    """Monotonic expiry for a cache entry: the TTL, or the JWT's exp if sooner."""
+    deadline = time.monotonic() + _TOKEN_CACHE_TTL
+    try:
+        # signature already checked by decode_token_raw; only exp is read here
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return deadline
+    if exp is None:
+        return deadline
+    return min(deadline, time.monotonic() + (float(exp) - time.time()))
+
+def forget_user_tokens(user_id: int) -> None:
+    with _TOKEN_CACHE_LOCK:
+        for token, (_, user) in list(_TOKEN_CACHE.items()):
+            if user.id == user_id:
+                _TOKEN_CACHE.pop(token, None)
+
 def get_optional_user(request: Request, db: Session = Depends(get_db)) -> Optional[UserResponse]:
     token = request.headers.get("Authorization")
     if token and token.startswith("Bearer "):
         token = token.replace("Bearer ", "")
-        return decode_token_raw(token, db)
+        hit = _TOKEN_CACHE.get(token)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        user = decode_token_raw(token, db)
+        if user is not None:
+            deadline = _token_cache_deadline(token)
+            with _TOKEN_CACHE_LOCK:
+                if token not in _TOKEN_CACHE and len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+                    _TOKEN_CACHE.pop(next(iter(_TOKEN_CACHE)))  # drop oldest entry
+                _TOKEN_CACHE[token] = (deadline, user)
+        return user
     return None
 
 @router.post("/threads", response_model=ThreadOut)
@@ -25,11 +75,26 @@ def create_thread(
     db.add(new_thread)
     db.commit()
     db.refresh(new_thread)
+    _threads_cache_clear()
     return new_thread
 
 @router.get("/threads", response_model=List[ThreadOut])
 def get_threads(db: Session = Depends(get_db)):
-    return db.query(Thread).all()
+    global _THREADS_CACHE
+    hit = _THREADS_CACHE
+    if hit and hit[0] > time.monotonic():
+        return Response(content=hit[1], media_type="application/json")
+
+    # ThreadOut renders comments but no users: load all comments in one IN query
+    # and skip the mapped joined-load of Thread.user / Comment.user.
+    threads = (
+        db.query(Thread)
+        .options(selectinload(Thread.comments).raiseload("*"), raiseload("*"))
+        .all()
+    )
+    body = _THREADS_ADAPTER.dump_json(_THREADS_ADAPTER.validate_python(threads, from_attributes=True))
+    _THREADS_CACHE = (time.monotonic() + _THREADS_CACHE_TTL, body)
+    return Response(content=body, media_type="application/json")
 
 @router.post("/comments", response_model=CommentOut)
 def add_comment(
@@ -52,18 +117,20 @@ def add_comment(
     db.add(new_comment)
     db.commit()
     db.refresh(new_comment)
+    _threads_cache_clear()
     return new_comment
 
 @router.get("/comments/{comment_id}", response_model=CommentOut)
 def get_comment(comment_id: int, db: Session = Depends(get_db)):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = db.query(Comment).options(raiseload("*")).filter(Comment.id == comment_id).first()
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     return comment
 
 @router.get("/threads/{thread_id}/comments", response_model=List[CommentOut])
 def get_comments_for_thread(thread_id: int, db: Session = Depends(get_db)):
-    return db.query(Comment).filter(Comment.thread_id == thread_id).all()
+    # CommentOut has no user fields; don't join users in
+    return db.query(Comment).options(raiseload("*")).filter(Comment.thread_id == thread_id).all()
 
 @router.delete("/threads/{thread_id}")
 def delete_thread(
@@ -82,6 +149,7 @@ def delete_thread(
 
     db.delete(thread)
     db.commit()
+    _threads_cache_clear()
     return {"detail": "Thread deleted"}
 
 
@@ -102,4 +170,5 @@ def delete_comment(
 
     db.delete(comment)
     db.commit()
+    _threads_cache_clear()
     return {"detail": "Comment deleted"}
\ No newline at end of file
@@ -1,34 +1,97 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, insert, select, text, update
 from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from collections import Counter
+from typing import Dict, Optional
+import re
+import threading
+import time
 from models import GroceryList, GroceryItem, FoodInventory, Recipe, User
-from database import get_db
+from database import get_db, relax_commit_durability
 from routers.auth import get_current_user_dependency
 
 router = APIRouter()
 
+# user id -> (expires_at, id of their latest grocery list). Lists are never
+# swapped out from under a user, so entries only change when a new list is
+# created here; the TTL covers lists created by other workers.
+_LATEST_LIST_TTL = 60.0
+_LATEST_LIST_MAX = 10000
+_LATEST_LIST: Dict[int, tuple] = {}
+_LATEST_LIST_LOCK = threading.Lock()
+
+# Only inserts when the user has no list yet; run under the per-user advisory
+# lock in _get_or_create_grocery_list_id so concurrent first visits can't both
+# create one.
+_SQL_GROCERY_LIST_CREATE = text(
+    """
+    INSERT INTO grocery_lists (user_id, created_at)
+    SELECT :uid, timezone('utc', now())
+    WHERE NOT EXISTS (SELECT 1 FROM grocery_lists WHERE user_id = :uid)
+    RETURNING id
+    """
+)
+_SQL_GROCERY_LIST_LOCK = text("SELECT pg_advisory_xact_lock(hashtext('grocery_lists'), :uid)")
+
+# Comma plus any surrounding whitespace, so tokens come out already trimmed.
+_INGREDIENT_SPLIT = re.compile(r"\s*,\s*")
+
+
+def _remember_latest_list(user_id: int, list_id: int) -> None:
+    with _LATEST_LIST_LOCK:
+        if user_id not in _LATEST_LIST and len(_LATEST_LIST) >= _LATEST_LIST_MAX:
+            _LATEST_LIST.pop(next(iter(_LATEST_LIST)), None)  # drop oldest entry
+        _LATEST_LIST[user_id] = (time.monotonic() + _LATEST_LIST_TTL, list_id)
+
+
+def _latest_grocery_list_id(db: Session, user_id: int) -> Optional[int]:
+    hit = _LATEST_LIST.get(user_id)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    list_id = db.execute(
+        select(GroceryList.id)
+        .where(GroceryList.user_id == user_id)
+        .order_by(GroceryList.created_at.desc())
+        .limit(1)
+    ).scalar()
+    if list_id is not None:
+        _remember_latest_list(user_id, list_id)
+    return list_id
+
+
+def _get_or_create_grocery_list_id(db: Session, user_id: int) -> tuple:
+    """
+    (list_id, created). A newly created list is only in the open transaction,
+    so callers remember it with _remember_latest_list after they commit.
+    """
+    list_id = _latest_grocery_list_id(db, user_id)
+    if list_id is not None:
+        return list_id, False
+
+    # Lock is held until commit/rollback; a request that waited on it sees the
+    # other one's committed list and the INSERT below becomes a no-op.
+    db.execute(_SQL_GROCERY_LIST_LOCK, {"uid": user_id})
+    list_id = db.execute(_SQL_GROCERY_LIST_CREATE, {"uid": user_id}).scalar()
+    if list_id is None:
+        return _latest_grocery_list_id(db, user_id), False
+    return list_id, True
+
 
 @router.get("/grocery-list")
 def get_or_create_grocery_list(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_dependency)
 ):
-    grocery_list = db.query(GroceryList).filter(
-        GroceryList.user_id == current_user.id
-    ).order_by(GroceryList.created_at.desc()).first()
-
-    if not grocery_list:
-        grocery_list = GroceryList(
-            user_id=current_user.id,
-            created_at=datetime.utcnow()
-        )
-        db.add(grocery_list)
+    list_id, created = _get_or_create_grocery_list_id(db, current_user.id)
+
+    if created:
         db.commit()
-        db.refresh(grocery_list)
+        _remember_latest_list(current_user.id, list_id)
 
-    items = db.query(GroceryItem).filter(GroceryItem.grocery_list_id == grocery_list.id).all()
+    items = db.query(GroceryItem).filter(GroceryItem.grocery_list_id == list_id).all()
     return {
-        "id": grocery_list.id,
+        "id": list_id,
         "items": [
             {"id": item.id, "name": item.name, "quantity": item.quantity, "checked": item.checked}
             for item in items
@@ -42,24 +105,24 @@ def add_item_to_grocery_list(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_dependency)
 ):
-    grocery_list = db.query(GroceryList).filter(
-        GroceryList.user_id == current_user.id
-    ).order_by(GroceryList.created_at.desc()).first()
+    list_id = _latest_grocery_list_id(db, current_user.id)
 
-    if not grocery_list:
+    if list_id is None:
         raise HTTPException(status_code=404, detail="No grocery list found")
 
+    relax_commit_durability(db)
     item = GroceryItem(
-        grocery_list_id=grocery_list.id,
+        grocery_list_id=list_id,
         name=payload.get("name"),
         quantity=payload.get("quantity", 1),
         checked=False
     )
     db.add(item)
+    db.flush()  # INSERT ... RETURNING id; no refresh SELECT after commit
+    out = {"id": item.id, "name": item.name, "quantity": item.quantity, "checked": item.checked}
     db.commit()
-    db.refresh(item)
 
-    return {"message": "Item added", "item": {"id": item.id, "name": item.name, "quantity": item.quantity, "checked": item.checked}}
+    return {"message": "Item added", "item": out}
 
 
 @router.put("/grocery-list/item/{item_id}")
@@ -69,17 +132,26 @@ def update_item(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_dependency)
 ):
-    item = db.query(GroceryItem).join(GroceryList).filter(
-        GroceryItem.id == item_id,
-        GroceryList.user_id == current_user.id
-    ).first()
+    values = {k: payload[k] for k in ("name", "quantity", "checked") if k in payload}
+    owned = GroceryItem.grocery_list_id.in_(
+        select(GroceryList.id).where(GroceryList.user_id == current_user.id)
+    )
 
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
+    # Ownership check and write in one statement
+    if values:
+        found = db.execute(
+            update(GroceryItem)
+            .where(GroceryItem.id == item_id, owned)
+            .values(**values)
+            .returning(GroceryItem.id)
+        ).first()
+    else:
+        found = db.execute(
+            select(GroceryItem.id).where(GroceryItem.id == item_id, owned)
+        ).first()
 
-    item.name = payload.get("name", item.name)
-    item.quantity = payload.get("quantity", item.quantity)
-    item.checked = payload.get("checked", item.checked)
+    if not found:
+        raise HTTPException(status_code=404, detail="Item not found")
 
     db.commit()
     return {"message": "Item updated"}
@@ -91,15 +163,19 @@ def delete_item(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_dependency)
 ):
-    item = db.query(GroceryItem).join(GroceryList).filter(
-        GroceryItem.id == item_id,
-        GroceryList.user_id == current_user.id
-    ).first()
+    deleted = db.execute(
+        delete(GroceryItem).where(
+            GroceryItem.id == item_id,
+            GroceryItem.grocery_list_id.in_(
+                select(GroceryList.id).where(GroceryList.user_id == current_user.id)
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
 
-    if not item:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    db.delete(item)
     db.commit()
     return {"message": "Item deleted"}
 
@@ -108,43 +184,49 @@ def import_checked_items_to_inventory(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_dependency)
 ):
-    grocery_list = db.query(GroceryList).filter(
-        GroceryList.user_id == current_user.id
-    ).order_by(GroceryList.created_at.desc()).first()
+    list_id = _latest_grocery_list_id(db, current_user.id)
 
-    if not grocery_list:
+    if list_id is None:
         raise HTTPException(status_code=404, detail="No grocery list found")
 
-    checked_items = db.query(GroceryItem).filter(
-        GroceryItem.grocery_list_id == grocery_list.id,
-        GroceryItem.checked == True
+    # Take the checked items off the list and read them back in one statement;
+    # nothing is committed unless the inventory upsert below goes through.
+    checked_items = db.execute(
+        delete(GroceryItem)
+        .where(
+            GroceryItem.grocery_list_id == list_id,
+            GroceryItem.checked == True
+        )
+        .returning(GroceryItem.name, GroceryItem.quantity)
     ).all()
 
     if not checked_items:
         return {"message": "No items marked as 'in cart'"}
 
-    added_count = 0
+    # Merge same-named list rows first: one upsert row per name
+    # (ON CONFLICT can't touch the same inventory row twice in one statement).
+    quantities = {}
     for item in checked_items:
-        # Add to inventory or update existing
-        existing = db.query(FoodInventory).filter_by(
-            user_id=current_user.id,
-            name=item.name
-        ).first()
+        quantities[item.name] = quantities.get(item.name, 0) + (item.quantity or 1)
 
-        if existing:
-            existing.quantity += item.quantity or 1
-        else:
-            db.add(FoodInventory(
-                user_id=current_user.id,
-                name=item.name,
-                quantity=item.quantity or 1,
-                desired_quantity=item.quantity or 1,
-                categories=""
-            ))
-        # Delete item from grocery list
-        db.delete(item)
-        added_count += 1
+    # Add to inventory or update existing, in a single statement
+    stmt = pg_insert(FoodInventory).values([
+        {
+            "user_id": current_user.id,
+            "name": name,
+            "quantity": qty,
+            "desired_quantity": qty,
+            "categories": "",
+        }
+        for name, qty in quantities.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "name"],
+        set_={"quantity": FoodInventory.quantity + stmt.excluded.quantity},
+    )
+    db.execute(stmt)
 
+    added_count = len(checked_items)
     db.commit()
     return {"message": f"{added_count} items imported and removed from grocery list"}
 
@@ -173,31 +255,17 @@ def add_shortfalls_to_grocery_list(
         return {"message": "All inventory items are fully stocked."}
 
     # Get or create grocery list
-    grocery_list = (
-        db.query(GroceryList)
-        .filter(GroceryList.user_id == current_user.id)
-        .order_by(GroceryList.created_at.desc())
-        .first()
-    )
+    list_id, created = _get_or_create_grocery_list_id(db, current_user.id)
 
-    if not grocery_list:
-        grocery_list = GroceryList(
-            user_id=current_user.id,
-            created_at=datetime.utcnow()
-        )
-        db.add(grocery_list)
-        db.flush()
-
-    # Add items to list
-    for item in shortfalls:
-        grocery_item = GroceryItem(
-            grocery_list_id=grocery_list.id,
-            name=item["name"],
-            quantity=item["quantity"]
-        )
-        db.add(grocery_item)
+    # Add items to list (one batched INSERT)
+    db.execute(insert(GroceryItem), [
+        {"grocery_list_id": list_id, "name": item["name"], "quantity": item["quantity"], "checked": False}
+        for item in shortfalls
+    ])
 
     db.commit()
+    if created:
+        _remember_latest_list(current_user.id, list_id)
 
     return {
         "message": f"{len(shortfalls)} shortfall item(s) added to grocery list.",
@@ -208,32 +276,37 @@ def add_shortfalls_to_grocery_list(
 def add_ingredients_from_recipes(recipe_ids: list[int], db: Session = Depends(get_db), current_user: User = Depends(get_current_user_dependency)):
     try:
         # Find or create user's grocery list
-        grocery_list = db.query(GroceryList).filter_by(user_id=current_user.id).first()
-        if not grocery_list:
-            grocery_list = GroceryList(user_id=current_user.id, created_at=datetime.utcnow())
-            db.add(grocery_list)
-            db.commit()
-            db.refresh(grocery_list)
-
-        added_items = []
-
+        # (a new list commits together with its items)
+        list_id, created = _get_or_create_grocery_list_id(db, current_user.id)
+
+        # Count each ingredient across all recipes (split and trim in one regex pass, skip blanks)
+        # (one IN query for all of the user's recipes; a repeated id still counts twice)
+        ingredients_by_id = dict(
+            db.query(Recipe.id, Recipe.ingredients)
+            .filter(Recipe.id.in_(set(recipe_ids)), Recipe.user_id == current_user.id)
+            .all()
+        ) if recipe_ids else {}
+        ingredient_counts = Counter()
         for recipe_id in recipe_ids:
-            recipe = db.query(Recipe).filter_by(id=recipe_id, user_id=current_user.id).first()
-            if not recipe:
+            ingredients = ingredients_by_id.get(recipe_id)
+            if ingredients is None:
                 continue
 
-            ingredients = [i.strip() for i in recipe.ingredients.split(",") if i.strip()]
-            for ingredient in ingredients:
-                grocery_item = GroceryItem(
-                    grocery_list_id=grocery_list.id,
-                    name=ingredient,
-                    quantity=1,
-                    checked=False
-                )
-                db.add(grocery_item)
-                added_items.append(ingredient)
+            ingredient_counts.update(
+                name for name in _INGREDIENT_SPLIT.split(ingredients.strip()) if name
+            )
+
+        # One batched INSERT, one row per ingredient with its count as quantity
+        added_items = list(ingredient_counts)
+        if ingredient_counts:
+            db.execute(insert(GroceryItem), [
+                {"grocery_list_id": list_id, "name": ingredient, "quantity": quantity, "checked": False}
+                for ingredient, quantity in ingredient_counts.items()
+            ])
 
         db.commit()
+        if created:
+            _remember_latest_list(current_user.id, list_id)
         return {"message": f"✅ Added ingredients from {len(recipe_ids)} recipe(s) to grocery list.", "added": added_items}
 
     except Exception as e:
@@ -245,14 +318,9 @@ def clear_grocery_list(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user_dependency)
 ):
-    grocery_list = (
-        db.query(GroceryList)
-        .filter_by(user_id=current_user.id)
-        .order_by(GroceryList.created_at.desc())
-        .first()
-    )
-    if grocery_list:
-        db.query(GroceryItem).filter_by(grocery_list_id=grocery_list.id).delete()
+    list_id = _latest_grocery_list_id(db, current_user.id)
+    if list_id is not None:
+        db.query(GroceryItem).filter_by(grocery_list_id=list_id).delete()
         db.commit()
         return {"message": "Grocery list cleared."}
     return {"message": "No grocery list found."}
\ No newline at end of file
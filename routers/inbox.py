@@ -1,21 +1,134 @@
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session, selectinload
-from typing import Optional, List
-from sqlalchemy import func, distinct
+from sqlalchemy.orm import Session, aliased
+from typing import Dict, NamedTuple, Optional, List
+from sqlalchemy import bindparam, distinct, exists, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from models import Problem, Solution, InboxMessage, Conversation, ConversationUser, User, ForgeItem
-from database import get_db
+from database import get_db, relax_commit_durability
 
 
 import re
+import threading
+import time
+from functools import lru_cache
 
 router = APIRouter()
 
 ADMIN_EMAIL = "sheaklipper@gmail.com"
 
+# Pre-built statements for the hot read paths (built once at import, so each
+# call reuses the same statement object and its compiled form). Message lists
+# are read newest-first one page at a time; see _seek_messages.
+_USER_BY_EMAIL = select(User.id, User.email, User.username).where(User.email == bindparam("email"))
+_CONVO_BY_NAME = select(Conversation).where(Conversation.name == bindparam("name"))
+_CONVO_ID_BY_NAME = select(Conversation.id).where(Conversation.name == bindparam("name"))
+_NEWEST_FIRST = (InboxMessage.timestamp.desc(), InboxMessage.id.desc())
+_CONVO_MESSAGES = (
+    select(
+        InboxMessage.id,
+        InboxMessage.content,
+        InboxMessage.timestamp,
+        InboxMessage.read,
+        InboxMessage.user_id,
+    )
+    .where(InboxMessage.conversation_id == bindparam("cid"))
+    .order_by(*_NEWEST_FIRST)
+    .limit(bindparam("limit"))
+)
+_CONVO_MESSAGES_WITH_SENDER = (
+    _CONVO_MESSAGES
+    .add_columns(User.email.label("from_email"), User.username.label("from_username"))
+    .outerjoin(User, User.id == InboxMessage.user_id)
+)
+# Whole idea/problem threads, oldest first, with the sender's username.
+_THREAD_MESSAGES = (
+    select(
+        InboxMessage.id,
+        InboxMessage.content,
+        InboxMessage.timestamp,
+        InboxMessage.read,
+        InboxMessage.user_id,
+        User.username.label("from_username"),
+    )
+    .outerjoin(User, User.id == InboxMessage.user_id)
+    .where(InboxMessage.conversation_id == bindparam("cid"))
+    .order_by(InboxMessage.timestamp.asc(), InboxMessage.id.asc())
+)
+# Feed rows carry the conversation name and sender email as plain columns, so
+# rendering them never lazy-loads per message.
+_FEED_MESSAGES = (
+    select(
+        InboxMessage.id,
+        InboxMessage.conversation_id,
+        Conversation.name.label("conversation_name"),
+        InboxMessage.content,
+        InboxMessage.timestamp,
+        InboxMessage.read,
+        InboxMessage.user_id,
+        User.email.label("from_email"),
+    )
+    .outerjoin(Conversation, Conversation.id == InboxMessage.conversation_id)
+    .outerjoin(User, User.id == InboxMessage.user_id)
+    .where(
+        InboxMessage.conversation_id.in_(
+            select(ConversationUser.conversation_id)
+            .where(ConversationUser.user_id == bindparam("uid"))
+        )
+    )
+    .order_by(*_NEWEST_FIRST)
+    .limit(bindparam("limit"))
+)
+
+# One pass over the caller's messages: each conversation's newest message
+# (rn = 1) together with its unread count, plus the conversation's own columns.
+_RANKED_MESSAGES = (
+    select(
+        InboxMessage.conversation_id,
+        InboxMessage.content,
+        InboxMessage.timestamp,
+        func.row_number().over(
+            partition_by=InboxMessage.conversation_id,
+            order_by=(InboxMessage.timestamp.desc(), InboxMessage.id.desc()),
+        ).label("rn"),
+        func.count().filter(InboxMessage.read == False)  # noqa: E712
+            .over(partition_by=InboxMessage.conversation_id).label("unread"),
+    )
+    .where(
+        InboxMessage.conversation_id.in_(
+            select(ConversationUser.conversation_id)
+            .where(ConversationUser.user_id == bindparam("uid"))
+        )
+    )
+    .cte("ranked")
+)
+_PEER = aliased(User)
+_CONVO_SUMMARIES = (
+    select(
+        _RANKED_MESSAGES.c.conversation_id,
+        _RANKED_MESSAGES.c.content,
+        _RANKED_MESSAGES.c.timestamp,
+        _RANKED_MESSAGES.c.unread,
+        Conversation.name,
+        Conversation.created_at,
+        _PEER.email.label("other_email"),
+        _PEER.username.label("other_username"),
+    )
+    .outerjoin(Conversation, Conversation.id == _RANKED_MESSAGES.c.conversation_id)
+    .join(
+        ConversationUser,
+        (ConversationUser.conversation_id == _RANKED_MESSAGES.c.conversation_id)
+        & (ConversationUser.user_id == bindparam("uid")),
+    )
+    .outerjoin(_PEER, _PEER.id == ConversationUser.peer_user_id)
+    .where(_RANKED_MESSAGES.c.rn == 1)
+    .order_by(_RANKED_MESSAGES.c.timestamp.desc(), _RANKED_MESSAGES.c.conversation_id.desc())
+)
+
 # ========= Schemas =========
 
 class SendMessageIn(BaseModel):
@@ -42,140 +155,393 @@ class FeedbackIn(BaseModel):
 
 # ========= Helpers =========
 
+@lru_cache(maxsize=None)
+def _after_cursor(stmt):
+    """
+    The cursor-page variant of a prebuilt message statement, built once so it
+    keeps its memoized cache key instead of being re-derived per request.
+    """
+    return stmt.where(
+        tuple_(InboxMessage.timestamp, InboxMessage.id)
+        < tuple_(
+            bindparam("before_ts", type_=InboxMessage.timestamp.type),
+            bindparam("before_id", type_=InboxMessage.id.type),
+        )
+    )
+
+@lru_cache(maxsize=None)
+def _unbounded(stmt):
+    """The whole-history variant of a prebuilt message statement (no LIMIT)."""
+    return stmt.limit(None)
+
+_PAGE_SIZE = 50
+
+def _seek_messages(db: Session, stmt, params: dict, limit: Optional[int], before: Optional[str],
+                   response: Response) -> list:
+    """
+    One page of a newest-first message statement, returned oldest-first.
+    `before` is the opaque "timestamp|id" cursor from a previous page's
+    X-Next-Cursor header; the header is only set when the page came back full.
+    With neither `limit` nor `before` the whole history comes back, as it did
+    before paging existed; a `before` without a `limit` pages by _PAGE_SIZE.
+    """
+    if limit is None and not before:
+        rows = db.execute(_unbounded(stmt), params).all()
+        rows.reverse()
+        return rows
+    if limit is None:
+        limit = _PAGE_SIZE
+    if before:
+        try:
+            ts, mid = before.split("|")
+            params = {**params, "before_ts": datetime.fromisoformat(ts), "before_id": int(mid)}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = _after_cursor(stmt)
+    rows = db.execute(stmt, {**params, "limit": limit}).all()
+    if rows and len(rows) == limit:
+        oldest = rows[-1]
+        response.headers["X-Next-Cursor"] = f"{oldest.timestamp.isoformat()}|{oldest.id}"
+    rows.reverse()
+    return rows
+
+def _json_page(content: list, response: Response) -> ORJSONResponse:
+    """
+    Render a message page straight through orjson (skipping jsonable_encoder).
+    A returned Response doesn't inherit headers set on the injected one, so
+    carry X-Next-Cursor over by hand.
+    """
+    cursor = response.headers.get("X-Next-Cursor")
+    return ORJSONResponse(content, headers={"X-Next-Cursor": cursor} if cursor else None)
+
+def _thread_messages(db: Session, convo_id: int, system_user_id: int) -> List[dict]:
+    """A public idea/problem thread as plain dicts; senders are shown by name, never email."""
+    def safe_display(m):
+        if m.user_id == system_user_id:
+            return "System"
+        if m.from_username:
+            return m.from_username
+        if m.user_id:
+            return f"User {m.user_id}"
+        return "User"
+
+    return [
+        {
+            "id": m.id,
+            "content": m.content,
+            "timestamp": m.timestamp,
+            "read": m.read,
+            "from_username": m.from_username,
+            "from_user_id": m.user_id,
+            "from_system": (m.user_id == system_user_id),
+            "from_display": safe_display(m),
+        }
+        for m in db.execute(_THREAD_MESSAGES, {"cid": convo_id})
+    ]
+
+def _titles(db: Session, model, ids) -> Dict[int, Optional[str]]:
+    """id -> title for several rows of an idea/problem/solution model in one query."""
+    if not ids:
+        return {}
+    return dict(db.execute(select(model.id, model.title).where(model.id.in_(ids))).all())
+
 def get_idea_title(db: Session, idea_id: int) -> str:
-    row = db.query(ForgeItem).filter(ForgeItem.id == idea_id).first()
-    return (row.title or f"Idea #{idea_id}") if row else f"Idea #{idea_id}"
+    return _titles(db, ForgeItem, [idea_id]).get(idea_id) or f"Idea #{idea_id}"
 
-def get_user_by_email(db: Session, email: str) -> User:
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+def _is_member(db: Session, conversation_id: int, user_id: int) -> bool:
+    return db.query(
+        exists().where(
+            ConversationUser.conversation_id == conversation_id,
+            ConversationUser.user_id == user_id,
+        )
+    ).scalar()
+
+class UserLite(NamedTuple):
+    id: int
+    email: str
+    username: Optional[str]
+
+
+# email -> (expires_at, UserLite), shared across requests. Callers here only
+# need the id/email/username, so plain tuples are cached rather than ORM rows
+# bound to one Session. forget_user drops an entry when a user is edited.
+_USER_LITE_TTL = 60.0
+_USER_LITE_MAX = 10000
+_USER_LITE: Dict[str, tuple] = {}
+_USER_LITE_LOCK = threading.Lock()
+
+
+def _remember_user(user: UserLite) -> None:
+    with _USER_LITE_LOCK:
+        if user.email not in _USER_LITE and len(_USER_LITE) >= _USER_LITE_MAX:
+            _USER_LITE.pop(next(iter(_USER_LITE)), None)  # drop oldest entry
+        _USER_LITE[user.email] = (time.monotonic() + _USER_LITE_TTL, user)
+
+
+def _cached_user(email: str) -> Optional[UserLite]:
+    hit = _USER_LITE.get(email)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+
+def forget_user(email: Optional[str]) -> None:
+    if email:
+        _USER_LITE.pop(email, None)
+
+
+def get_user_by_email(db: Session, email: str) -> UserLite:
+    user = _cached_user(email)
+    if user is not None:
+        return user
+    row = db.execute(_USER_BY_EMAIL, {"email": email}).first()
+    if not row:
         raise HTTPException(status_code=404, detail=f"User {email} not found")
+    user = UserLite(*row)
+    _remember_user(user)
     return user
 
+def get_users_by_emails(db: Session, *emails: str) -> List[UserLite]:
+    """Resolve several participants with one IN query; 404s on the first unknown email."""
+    found: Dict[str, UserLite] = {}
+    for email in emails:
+        user = _cached_user(email)
+        if user is not None:
+            found[email] = user
+    missing = {e for e in emails if e not in found}
+    if missing:
+        rows = db.execute(
+            select(User.id, User.email, User.username).where(User.email.in_(missing))
+        ).all()
+        for row in rows:
+            user = UserLite(*row)
+            _remember_user(user)
+            found[user.email] = user
+    for email in emails:
+        if email not in found:
+            raise HTTPException(status_code=404, detail=f"User {email} not found")
+    return [found[e] for e in emails]
+
+# The system user row never changes once created, so its id is looked up
+# (or created) once per process; the lock keeps concurrent first requests
+# from each inserting one.
+_SYSTEM_USER_ID: Optional[int] = None
+_SYSTEM_USER_LOCK = threading.Lock()
+
 def get_or_create_system_user(db: Session) -> User:
-    sys = db.query(User).filter(User.email == "system@domain.com").first()
-    if sys:
-        return sys
-    sys = User(email="system@domain.com", username="System")
-    db.add(sys)
-    db.commit()
-    db.refresh(sys)
+    global _SYSTEM_USER_ID
+    if _SYSTEM_USER_ID is not None:
+        sys = db.get(User, _SYSTEM_USER_ID)
+        if sys:
+            return sys
+        _SYSTEM_USER_ID = None  # row went away (e.g. DB reset); look it up again
+    with _SYSTEM_USER_LOCK:
+        sys = db.query(User).filter(User.email == "system@domain.com").first()
+        if not sys:
+            sys = User(email="system@domain.com", username="System")
+            db.add(sys)
+            db.commit()
+            db.refresh(sys)
+        _SYSTEM_USER_ID = sys.id
     return sys
 
-def get_or_create_system_conversation_for_user(db: Session, user: User, sys_user: User) -> Conversation:
+def get_system_user_id(db: Session) -> int:
+    """The system user's id without loading the row (after the first call)."""
+    if _SYSTEM_USER_ID is not None:
+        return _SYSTEM_USER_ID
+    return get_or_create_system_user(db).id
+
+_WELCOME = "Welcome to your inbox! This is a system-generated message."
+
+_SQL_ADOPT_LEGACY_SYSTEM_CONVO = text(
+    """
+    WITH upd AS (
+        UPDATE conversations SET name = :key
+        WHERE id = (
+            SELECT c.id FROM conversations c
+            JOIN conversation_users cu ON cu.conversation_id = c.id AND cu.user_id = :uid
+            WHERE c.name = 'System'
+            ORDER BY c.id
+            LIMIT 1
+        )
+        RETURNING id, created_at, name
+    ), ins_cu AS (
+        INSERT INTO conversation_users (user_id, conversation_id)
+        SELECT :sys, id FROM upd
+        ON CONFLICT ON CONSTRAINT uq_conv_user DO NOTHING
+    ), ins_msg AS (
+        INSERT INTO inbox_messages (user_id, conversation_id, content, read)
+        SELECT :sys, upd.id, :welcome, false FROM upd
+        WHERE NOT EXISTS (SELECT 1 FROM inbox_messages m WHERE m.conversation_id = upd.id)
+    )
+    SELECT id, created_at, name FROM upd
+    """
+).bindparams(welcome=_WELCOME)
+
+# Fresh System conversation: the conversation, both participants and the
+# welcome in one round trip. A concurrent creator wins the name and this
+# returns no row.
+_SQL_CREATE_SYSTEM_CONVO = text(
+    """
+    WITH convo AS (
+        INSERT INTO conversations (name, created_at)
+        VALUES (:key, timezone('utc', now()))
+        ON CONFLICT (name) DO NOTHING
+        RETURNING id, created_at, name
+    ), ins_cu AS (
+        INSERT INTO conversation_users (user_id, conversation_id)
+        SELECT p.user_id, convo.id FROM convo, (VALUES (:uid), (:sys)) AS p(user_id)
+        ON CONFLICT ON CONSTRAINT uq_conv_user DO NOTHING
+    ), ins_msg AS (
+        INSERT INTO inbox_messages (user_id, conversation_id, content, read)
+        SELECT :sys, id, :welcome, false FROM convo
+    )
+    SELECT id, created_at, name FROM convo
+    """
+).bindparams(welcome=_WELCOME)
+
+def get_or_create_system_conversation_for_user(
+    db: Session, user: User, sys_user_id: int, commit: bool = True
+) -> Conversation:
     """
     Ensure the user has a private System conversation named 'system:{user.id}'.
     If we find an old-style convo named 'System' that includes the user, we rename it,
     attach the system user if missing, and seed a welcome if empty.
+    With commit=False the caller's transaction is left open for it to commit.
     """
     key = f"system:{user.id}"
 
     # Fast path: already migrated to deterministic key
-    convo = db.query(Conversation).filter(Conversation.name == key).first()
+    convo = db.scalars(_CONVO_BY_NAME, {"name": key}).first()
     if convo:
         return convo
 
-    # Legacy path: an old conversation literally named "System" that includes this user
-    legacy = (
-        db.query(Conversation)
-        .join(ConversationUser)
-        .filter(ConversationUser.user_id == user.id, Conversation.name == "System")
-        .first()
-    )
+    # Legacy path: an old conversation literally named "System" that includes this
+    # user is renamed, gets the system user attached and a welcome if empty, all
+    # in one statement.
+    params = {"key": key, "uid": user.id, "sys": sys_user_id}
+    legacy = db.scalars(
+        select(Conversation).from_statement(_SQL_ADOPT_LEGACY_SYSTEM_CONVO), params
+    ).first()
     if legacy:
-        legacy.name = key
-
-        # Ensure system user is attached
-        has_sys = (
-            db.query(ConversationUser)
-            .filter(
-                ConversationUser.conversation_id == legacy.id,
-                ConversationUser.user_id == sys_user.id,
-            )
-            .first()
-        )
-        if not has_sys:
-            db.add(ConversationUser(user_id=sys_user.id, conversation_id=legacy.id))
-
-        # Seed welcome if empty
-        has_msg = (
-            db.query(InboxMessage.id)
-            .filter(InboxMessage.conversation_id == legacy.id)
-            .first()
-        )
-        if not has_msg:
-            db.add(
-                InboxMessage(
-                    user_id=sys_user.id,
-                    content="Welcome to your inbox! This is a system-generated message.",
-                    timestamp=datetime.utcnow(),
-                    conversation_id=legacy.id,
-                )
-            )
-
-        db.commit()
-        db.refresh(legacy)
+        if commit:
+            db.commit()
+            db.refresh(legacy)
         return legacy
 
-    # Create fresh conversation with deterministic key
-    convo = Conversation(name=key)
-    db.add(convo)
-    db.flush()  # ensure convo.id is available
+    # Create fresh conversation with deterministic key, participants and welcome
+    convo = db.scalars(
+        select(Conversation).from_statement(_SQL_CREATE_SYSTEM_CONVO), params
+    ).first()
+    if convo is None:  # lost the race; the other request seeded it
+        convo = db.scalars(_CONVO_BY_NAME, {"name": key}).one()
 
-    # Attach both participants
-    db.add(ConversationUser(user_id=user.id, conversation_id=convo.id))
-    db.add(ConversationUser(user_id=sys_user.id, conversation_id=convo.id))
-
-    # Seed welcome
-    db.add(
-        InboxMessage(
-            user_id=sys_user.id,
-            content="Welcome to your inbox! This is a system-generated message.",
-            timestamp=datetime.utcnow(),
-            conversation_id=convo.id,
-        )
-    )
-
-    db.commit()
-    db.refresh(convo)
+    if commit:
+        db.commit()
+        db.refresh(convo)
     return convo
 
-def get_or_create_dm_conversation(db: Session, a: User, b: User) -> Conversation:
+# user id -> id of their System conversation once this process has ensured it
+# exists, so the inbox routes skip the get-or-create probe on later requests.
+# Dropped by the routes that can delete a conversation; capped like the other
+# in-process caches (a dropped entry just costs one probe again).
+_SYSTEM_CONVO_IDS_MAX = 10000
+_SYSTEM_CONVO_IDS: Dict[int, int] = {}
+_SYSTEM_CONVO_IDS_LOCK = threading.Lock()
+
+def get_system_conversation_id(db: Session, user: User, commit: bool = True) -> int:
+    convo_id = _SYSTEM_CONVO_IDS.get(user.id)
+    if convo_id is None:
+        convo_id = get_or_create_system_conversation_for_user(
+            db, user, get_system_user_id(db), commit
+        ).id
+        if commit:  # otherwise the caller remembers it once its own commit lands
+            _remember_system_conversation(user.id, convo_id)
+    return convo_id
+
+def _remember_system_conversation(user_id: int, conversation_id: int) -> None:
+    with _SYSTEM_CONVO_IDS_LOCK:
+        if user_id not in _SYSTEM_CONVO_IDS and len(_SYSTEM_CONVO_IDS) >= _SYSTEM_CONVO_IDS_MAX:
+            _SYSTEM_CONVO_IDS.pop(next(iter(_SYSTEM_CONVO_IDS)), None)  # drop oldest entry
+        _SYSTEM_CONVO_IDS[user_id] = conversation_id
+
+# "dm:…" / "idea:…" / "feedback" conversation name -> id. Names are unique and
+# never re-pointed, so once seen the id is good until the conversation is
+# deleted. Capped, oldest entry dropped first.
+_NAMED_CONVO_IDS_MAX = 10000
+_NAMED_CONVO_IDS: Dict[str, int] = {}
+_NAMED_CONVO_IDS_LOCK = threading.Lock()
+
+def _remember_named_conversation(key: str, conversation_id: int) -> None:
+    with _NAMED_CONVO_IDS_LOCK:
+        if key not in _NAMED_CONVO_IDS and len(_NAMED_CONVO_IDS) >= _NAMED_CONVO_IDS_MAX:
+            _NAMED_CONVO_IDS.pop(next(iter(_NAMED_CONVO_IDS)), None)  # drop oldest entry
+        _NAMED_CONVO_IDS[key] = conversation_id
+
+def _forget_conversation(conversation_id: int) -> None:
+    with _SYSTEM_CONVO_IDS_LOCK:
+        for user_id, convo_id in list(_SYSTEM_CONVO_IDS.items()):
+            if convo_id == conversation_id:
+                _SYSTEM_CONVO_IDS.pop(user_id, None)
+    with _NAMED_CONVO_IDS_LOCK:
+        for key, convo_id in list(_NAMED_CONVO_IDS.items()):
+            if convo_id == conversation_id:
+                _NAMED_CONVO_IDS.pop(key, None)
+
+def _upsert_named_conversation(db: Session, key: str) -> int:
+    # A concurrent creator of the same name just hands back the existing row.
+    return db.execute(
+        pg_insert(Conversation)
+        .values(name=key, created_at=datetime.utcnow())
+        .on_conflict_do_update(index_elements=[Conversation.name], set_={"name": key})
+        .returning(Conversation.id)
+    ).scalar_one()
+
+def get_or_create_dm_conversation_id(db: Session, a: User, b: User) -> int:
     """
     Deterministic key so A↔B always maps to the same DM conversation,
     and we never collide with System or other named convos.
     """
     key = f"dm:{min(a.id, b.id)}:{max(a.id, b.id)}"
-    convo = db.query(Conversation).filter(Conversation.name == key).first()
-    if convo:
-        return convo
-
-    convo = Conversation(name=key)
-    db.add(convo)
-    db.flush()
-
-    db.add(ConversationUser(user_id=a.id, conversation_id=convo.id))
-    db.add(ConversationUser(user_id=b.id, conversation_id=convo.id))
-
+    convo_id = _NAMED_CONVO_IDS.get(key)
+    if convo_id is not None:
+        return convo_id
+    convo_id = db.execute(_CONVO_ID_BY_NAME, {"name": key}).scalar_one_or_none()
+    if convo_id is not None:
+        _remember_named_conversation(key, convo_id)
+        return convo_id
+
+    # First message between the two: one upsert for the conversation and one
+    # multi-row insert for both participants.
+    convo_id = _upsert_named_conversation(db, key)
+    db.execute(
+        pg_insert(ConversationUser)
+        .values([
+            {"user_id": a.id, "conversation_id": convo_id, "peer_user_id": b.id},
+            {"user_id": b.id, "conversation_id": convo_id, "peer_user_id": a.id},
+        ])
+        .on_conflict_do_nothing(constraint="uq_conv_user")
+    )
     db.commit()
-    db.refresh(convo)
-    return convo
+    _remember_named_conversation(key, convo_id)
+    return convo_id
 
-def get_or_create_idea_conversation(db: Session, idea_id: int) -> Conversation:
+def get_or_create_idea_conversation_id(db: Session, idea_id: int) -> int:
     """
     One conversation per idea, named 'idea:{idea_id}'.
     We don't attach participants on creation; we add people when they send or 'follow'.
     """
     key = f"idea:{idea_id}"
-    convo = db.query(Conversation).filter(Conversation.name == key).first()
-    if convo:
-        return convo
+    convo_id = _NAMED_CONVO_IDS.get(key)
+    if convo_id is not None:
+        return convo_id
 
-    convo = Conversation(name=key)
-    db.add(convo)
-    db.commit()
-    db.refresh(convo)
-    return convo
+    convo_id = db.execute(_CONVO_ID_BY_NAME, {"name": key}).scalar_one_or_none()
+    if convo_id is None:
+        convo_id = _upsert_named_conversation(db, key)
+        db.commit()
+    _remember_named_conversation(key, convo_id)
+    return convo_id
 
 def get_or_create_user_by_email_or_create(db: Session, email: str, username: Optional[str] = None) -> User:
     user = db.query(User).filter(User.email == email).first()
@@ -187,36 +553,30 @@ def get_or_create_user_by_email_or_create(db: Session, email: str, username: Opt
     db.refresh(user)
     return user
 
-def get_or_create_feedback_conversation(db: Session, system_user: User, admin_user: User) -> Conversation:
-    # Try to find an existing "feedback" conversation that includes the admin
-    convo = (
-        db.query(Conversation)
-        .join(ConversationUser)
-        .filter(Conversation.name == "feedback", ConversationUser.user_id == admin_user.id)
-        .first()
+def get_or_create_feedback_conversation_id(db: Session, system_user_id: int, admin_user_id: int) -> int:
+    """
+    The shared 'feedback' conversation with admin and System as participants.
+    Nothing is committed here; the caller commits along with its message and
+    then remembers the id with _remember_named_conversation.
+    """
+    convo_id = _NAMED_CONVO_IDS.get("feedback")
+    if convo_id is not None:
+        return convo_id
+
+    convo_id = db.execute(_CONVO_ID_BY_NAME, {"name": "feedback"}).scalar_one_or_none()
+    if convo_id is None:
+        convo_id = _upsert_named_conversation(db, "feedback")
+
+    # Ensure admin and system are both in it
+    db.execute(
+        pg_insert(ConversationUser)
+        .values([
+            {"user_id": admin_user_id, "conversation_id": convo_id},
+            {"user_id": system_user_id, "conversation_id": convo_id},
+        ])
+        .on_conflict_do_nothing(constraint="uq_conv_user")
     )
-    if convo:
-        # Ensure system is in it
-        has_sys = (
-            db.query(ConversationUser)
-            .filter(ConversationUser.conversation_id == convo.id, ConversationUser.user_id == system_user.id)
-            .first()
-        )
-        if not has_sys:
-            db.add(ConversationUser(user_id=system_user.id, conversation_id=convo.id))
-            db.commit()
-        return convo
-
-    # Create fresh
-    convo = Conversation(name="feedback")
-    db.add(convo)
-    db.flush()  # ensure convo.id
-
-    db.add(ConversationUser(user_id=admin_user.id, conversation_id=convo.id))
-    db.add(ConversationUser(user_id=system_user.id, conversation_id=convo.id))
-    db.commit()
-    db.refresh(convo)
-    return convo
+    return convo_id
 
 def resolve_conversation_title(db: Session, convo: Conversation) -> str:
     name = (convo.name or "").strip()
@@ -251,28 +611,26 @@ def resolve_conversation_title(db: Session, convo: Conversation) -> str:
     return f"Conversation #{convo.id}"
 
 def get_problem_title(db: Session, problem_id: int) -> str:
-    row = db.query(Problem).filter(Problem.id == problem_id).first()
-    return (row.title or f"Problem #{problem_id}") if row else f"Problem #{problem_id}"
+    return _titles(db, Problem, [problem_id]).get(problem_id) or f"Problem #{problem_id}"
 
 def get_solution_title(db: Session, solution_id: int) -> str:
-    row = db.query(Solution).filter(Solution.id == solution_id).first()
-    return (row.title or f"Solution #{solution_id}") if row else f"Solution #{solution_id}"
+    return _titles(db, Solution, [solution_id]).get(solution_id) or f"Solution #{solution_id}"
 
 def get_or_create_problem_conversation(db: Session, problem_id: int) -> Conversation:
     """Use Problem.conversation_id if set; else create/attach a 'problem:{id}' conversation."""
-    prob = db.query(Problem).filter(Problem.id == problem_id).first()
+    prob = db.get(Problem, problem_id)
     if not prob:
         raise HTTPException(status_code=404, detail="Problem not found")
 
     # Already linked?
     if prob.conversation_id:
-        convo = db.query(Conversation).filter(Conversation.id == prob.conversation_id).first()
+        convo = db.get(Conversation, prob.conversation_id)
         if convo:
             return convo
 
     # Try by deterministic name
     key = f"problem:{problem_id}"
-    convo = db.query(Conversation).filter(Conversation.name == key).first()
+    convo = db.scalars(_CONVO_BY_NAME, {"name": key}).first()
     if not convo:
         convo = Conversation(name=key)
         db.add(convo)
@@ -293,211 +651,170 @@ def send_to_system(data: SendMessageIn, db: Session = Depends(get_db)):
     Send a message into the caller's System conversation (auto-creates on first use).
     """
     sender = get_user_by_email(db, data.sender_email)
-    system_user = get_or_create_system_user(db)
-
-    convo = get_or_create_system_conversation_for_user(db, sender, system_user)
 
+    # On first use the conversation, its members and the welcome are inserted
+    # right away by one statement; the commit below covers them and this message.
+    convo_id = get_system_conversation_id(db, sender, commit=False)
+    # After the lookup: resolving the System user may commit, which would end
+    # the transaction this SET LOCAL applies to.
+    relax_commit_durability(db)
     msg = InboxMessage(
         user_id=sender.id,
         content=data.content,
-        timestamp=datetime.utcnow(),
-        conversation_id=convo.id,
+        conversation_id=convo_id,
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    db.flush()  # INSERT ... RETURNING id; build the reply before commit expires it
 
-    return {"status": "ok", "conversation_id": convo.id, "message_id": msg.id}
+    out = {"status": "ok", "conversation_id": convo_id, "message_id": msg.id}
+    uid = sender.id
+    db.commit()
+    _remember_system_conversation(uid, convo_id)
+    return out
 
-@router.get("/inbox/{user_email}")
-def get_inbox(user_email: str, db: Session = Depends(get_db)):
+@router.get("/inbox/{user_email}", response_class=ORJSONResponse)
+def get_inbox(
+    response: Response,
+    user_email: str,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    before: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     """
     Return ONLY the System conversation for the given user.
     """
     user = get_user_by_email(db, user_email)
-    system_user = get_or_create_system_user(db)
-    convo = get_or_create_system_conversation_for_user(db, user, system_user)
-
-    # Safety: backfill welcome if somehow empty
-    has_any = (
-        db.query(InboxMessage.id)
-        .filter(InboxMessage.conversation_id == convo.id)
-        .first()
-    )
-    if not has_any:
+    uid = user.id
+    system_user_id = get_system_user_id(db)
+    bootstrap = uid not in _SYSTEM_CONVO_IDS
+    # Bootstrap rows are written but not committed here; the one commit below
+    # covers them together with any welcome backfill.
+    convo_id = get_system_conversation_id(db, user, commit=False)
+
+    messages = _seek_messages(db, _CONVO_MESSAGES, {"cid": convo_id}, limit, before,
+                              response)
+
+    # Safety: backfill welcome if somehow empty (the first page doubles as the probe)
+    backfill = not messages and not before
+    if backfill:
         db.add(
             InboxMessage(
-                user_id=system_user.id,
-                content="Welcome to your inbox! This is a system-generated message.",
-                timestamp=datetime.utcnow(),
-                conversation_id=convo.id,
+                user_id=system_user_id,
+                content=_WELCOME,
+                conversation_id=convo_id,
             )
         )
+        db.flush()
+        messages = _seek_messages(db, _CONVO_MESSAGES, {"cid": convo_id}, limit, None,
+                                  response)
+    if bootstrap or backfill:
         db.commit()
+        _remember_system_conversation(uid, convo_id)
 
-    messages = (
-        db.query(InboxMessage)
-        .filter(InboxMessage.conversation_id == convo.id)
-        .order_by(InboxMessage.timestamp.asc())
-        .all()
-    )
-
-    return [
+    return _json_page([
         {
             "id": m.id,
             "content": m.content,
             "timestamp": m.timestamp,
             "read": m.read,
-            "from_system": (m.user_id == system_user.id),
+            "from_system": (m.user_id == system_user_id),
         }
         for m in messages
-    ]
-
-@router.get("/inbox/feed/{user_email}")
-def get_inbox_feed(user_email: str, db: Session = Depends(get_db)):
+    ], response)
+
+@router.get("/inbox/feed/{user_email}", response_class=ORJSONResponse)
+def get_inbox_feed(
+    response: Response,
+    user_email: str,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    before: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     """
     Return a unified feed: System + all DMs for the user.
     Bootstraps the System convo (and welcome) if missing.
     """
     user = get_user_by_email(db, user_email)
-    system_user = get_or_create_system_user(db)
-
-    # Ensure System convo exists (and seeded)
-    convo = get_or_create_system_conversation_for_user(db, user, system_user)
-
-    # Safety: backfill welcome if somehow empty
-    has_any = (
-        db.query(InboxMessage.id)
-        .filter(InboxMessage.conversation_id == convo.id)
-        .first()
-    )
-    if not has_any:
-        db.add(
-            InboxMessage(
-                user_id=system_user.id,
-                content="Welcome to your inbox! This is a system-generated message.",
-                timestamp=datetime.utcnow(),
-                conversation_id=convo.id,
+    uid = user.id
+    system_user_id = get_system_user_id(db)
+    bootstrap = uid not in _SYSTEM_CONVO_IDS
+
+    # Ensure System convo exists (and seeded); committed once below
+    convo_id = get_system_conversation_id(db, user, commit=False)
+
+    if bootstrap:
+        # Safety: backfill welcome if somehow empty. Checked once per user per
+        # process; after that the cached convo id means it was already seeded.
+        has_any = db.query(exists().where(InboxMessage.conversation_id == convo_id)).scalar()
+        if not has_any:
+            db.add(
+                InboxMessage(
+                    user_id=system_user_id,
+                    content=_WELCOME,
+                    conversation_id=convo_id,
+                )
             )
-        )
         db.commit()
+        _remember_system_conversation(uid, convo_id)
 
-    # Collect all conversation IDs the user participates in
-    convo_ids = [
-        row[0]
-        for row in db.query(ConversationUser.conversation_id)
-                     .filter(ConversationUser.user_id == user.id)
-                     .all()
-    ]
-    if not convo_ids:
-        return []
-
-    msgs = (
-        db.query(InboxMessage)
-        .filter(InboxMessage.conversation_id.in_(convo_ids))
-        .order_by(InboxMessage.timestamp.asc())
-        .all()
-    )
+    rows = _seek_messages(db, _FEED_MESSAGES, {"uid": uid}, limit, before, response)
 
-    return [
+    return _json_page([
         {
-            "id": m.id,
-            "conversation_id": m.conversation_id,
-            "conversation_name": m.conversation.name if getattr(m, "conversation", None) else None,
-            "content": m.content,
-            "timestamp": m.timestamp,
-            "read": m.read,
-            "from_system": (m.user_id == system_user.id),
-            "from_email": m.user.email if getattr(m, "user", None) else None,
+            "id": r.id,
+            "conversation_id": r.conversation_id,
+            "conversation_name": r.conversation_name,
+            "content": r.content,
+            "timestamp": r.timestamp,
+            "read": r.read,
+            "from_system": (r.user_id == system_user_id),
+            "from_email": r.from_email,
         }
-        for m in msgs
-    ]
+        for r in rows
+    ], response)
 
 @router.post("/inbox/read/{message_id}")
 def mark_read(message_id: int, db: Session = Depends(get_db)):
-    msg = db.query(InboxMessage).filter(InboxMessage.id == message_id).first()
-    if not msg:
+    updated = db.execute(
+        update(InboxMessage)
+        .where(InboxMessage.id == message_id, InboxMessage.read.isnot(True))
+        .values(read=True)
+        .returning(InboxMessage.id)
+    ).first()
+    if updated:
+        db.commit()
+        return {"status": "ok", "message": "updated"}
+    if not db.query(exists().where(InboxMessage.id == message_id)).scalar():
         raise HTTPException(status_code=404, detail="Message not found")
-    if msg.read:
-        return {"status": "ok", "message": "already_read"}
-    msg.read = True
-    db.commit()
-    return {"status": "ok", "message": "updated"}
+    return {"status": "ok", "message": "already_read"}
 
 @router.post("/conversations/dm/send")
 def send_dm(payload: DMSendIn, db: Session = Depends(get_db)):
     """
     Send a direct message between two users. Creates or reuses the DM conversation.
     """
-    sender = get_user_by_email(db, payload.sender_email)
-    recipient = get_user_by_email(db, payload.recipient_email)
+    sender, recipient = get_users_by_emails(db, payload.sender_email, payload.recipient_email)
 
-    convo = get_or_create_dm_conversation(db, sender, recipient)
+    convo_id = get_or_create_dm_conversation_id(db, sender, recipient)
 
+    relax_commit_durability(db)
     msg = InboxMessage(
         user_id=sender.id,
-        conversation_id=convo.id,
+        conversation_id=convo_id,
         content=payload.content,
-        timestamp=datetime.utcnow(),
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    db.flush()
 
-    return {"status": "ok", "conversation_id": convo.id, "message_id": msg.id}
+    out = {"status": "ok", "conversation_id": convo_id, "message_id": msg.id}
+    db.commit()
+    return out
 
-@router.get("/conversations/summaries/{user_email}")
+@router.get("/conversations/summaries/{user_email}", response_class=ORJSONResponse)
 def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
-    me = db.query(User).filter(User.email == user_email).first()
-    if not me:
-        raise HTTPException(status_code=404, detail=f"User {user_email} not found")
-
-    convo_ids = [
-        cid for (cid,) in db.query(ConversationUser.conversation_id)
-                            .filter(ConversationUser.user_id == me.id)
-                            .all()
-    ]
-    if not convo_ids:
-        return []
+    me = get_user_by_email(db, user_email)
 
-    sub_last = (
-        db.query(
-            InboxMessage.conversation_id,
-            func.max(InboxMessage.timestamp).label("last_ts"),
-        )
-        .filter(InboxMessage.conversation_id.in_(convo_ids))
-        .group_by(InboxMessage.conversation_id)
-        .subquery()
-    )
-
-    last_msgs = (
-        db.query(InboxMessage)
-          .options(
-              selectinload(InboxMessage.conversation)
-                  .selectinload(Conversation.conversation_users)
-                  .selectinload(ConversationUser.user),
-              selectinload(InboxMessage.user),
-          )
-          .join(
-              sub_last,
-              (InboxMessage.conversation_id == sub_last.c.conversation_id)
-              & (InboxMessage.timestamp == sub_last.c.last_ts),
-          )
-          .all()
-    )
-
-    unread_map = {
-        cid: cnt
-        for cid, cnt in (
-            db.query(InboxMessage.conversation_id, func.count(InboxMessage.id))
-              .filter(
-                  InboxMessage.conversation_id.in_(convo_ids),
-                  InboxMessage.read == False,  # noqa: E712
-              )
-              .group_by(InboxMessage.conversation_id)
-              .all()
-        )
-    }
+    last_msgs = db.execute(_CONVO_SUMMARIES, {"uid": me.id}).all()
 
     # ----- helpers -----
     ID_ANYWHERE = re.compile(r"(?P<id>\d+)")
@@ -534,32 +851,46 @@ def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
         after = re.sub(r"^\s*\d+[:\-_\s]*", "", after).strip()
         return kind, parsed_id, after
 
+    # Titles for every referenced idea/problem/solution, one IN query per kind
+    parsed = {}
+    wanted: Dict[str, set] = {"idea": set(), "problem": set(), "solution": set()}
+    for m in last_msgs:
+        cname = (m.name or "").strip()
+        if not cname:
+            continue
+        kind, parsed_id, slug = parse_kind_id_slug(cname)
+        if kind == "forge" or (kind is None and cname.isdigit()):
+            kind = "idea"
+        parsed[m.conversation_id] = (kind, parsed_id, slug)
+        if kind in wanted and parsed_id is not None:
+            wanted[kind].add(parsed_id)
+
+    idea_titles = _titles(db, ForgeItem, wanted["idea"])
+    problem_titles = _titles(db, Problem, wanted["problem"])
+    solution_titles = _titles(db, Solution, wanted["solution"])
+
     def title_for_item_or_legacy(thing_id: Optional[int], slug: str,
                              convo_created_at: Optional[datetime],
                              last_ts: Optional[datetime]) -> str:
         if thing_id is not None:
-            item = db.query(ForgeItem).filter(ForgeItem.id == thing_id).first()
-            if item:
-                return item.title or f"Idea #{thing_id}"
+            if thing_id in idea_titles:
+                return idea_titles[thing_id] or f"Idea #{thing_id}"
             return unslug(slug) or f"Idea #{thing_id}"
         return unslug(slug) or "Idea"
 
     def title_for_problem(pid: Optional[int], slug: str) -> str:
         if pid is not None:
-            row = db.query(Problem).filter(Problem.id == pid).first()
-            return (row.title if row and row.title else f"Problem #{pid}")
+            return problem_titles.get(pid) or f"Problem #{pid}"
         return unslug(slug) or "Problem"
 
     def title_for_solution(sid: Optional[int], slug: str) -> str:
         if sid is not None:
-            row = db.query(Solution).filter(Solution.id == sid).first()
-            return (row.title if row and row.title else f"Solution #{sid}")
+            return solution_titles.get(sid) or f"Solution #{sid}"
         return unslug(slug) or "Solution"
 
     out = []
     for m in last_msgs:
-        convo = m.conversation
-        cname = (convo.name or "").strip() if convo else ""
+        cname = (m.name or "").strip()
 
         other_email = None
         other_username = None
@@ -577,11 +908,7 @@ def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
             kind, parsed_id, slug = parse_kind_id_slug(cname)
 
             if kind == "dm":
-                for cu in convo.conversation_users:
-                    if cu.user and cu.user.email != user_email:
-                        other_email = cu.user.email
-                        other_username = cu.user.username
-                        break
+                other_email, other_username = m.other_email, m.other_username
                 title = other_username or other_email or "Direct Message"
 
             elif kind == "system":
@@ -591,7 +918,7 @@ def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
                 idea_id = parsed_id
                 idea_title = title_for_item_or_legacy(
                     parsed_id, slug,
-                    getattr(convo, "created_at", None),
+                    m.created_at,
                     m.timestamp
                 )
                 title = idea_title
@@ -599,7 +926,7 @@ def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
             elif kind == "problem":
                 problem_id = parsed_id
                 problem_title = title_for_problem(parsed_id, slug)
-                title = title_for_problem(parsed_id, slug)
+                title = problem_title
 
             elif kind == "solution":
                 solution_id = parsed_id
@@ -611,7 +938,7 @@ def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
                 idea_id = parsed_id
                 idea_title = title_for_item_or_legacy(
                     parsed_id, "",
-                    getattr(convo, "created_at", None),
+                    m.created_at,
                     m.timestamp
                 )
                 title = idea_title
@@ -625,7 +952,7 @@ def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
             "title": title,
             "last_content": m.content,
             "last_timestamp": m.timestamp,
-            "unread_count": unread_map.get(m.conversation_id, 0),
+            "unread_count": m.unread,
 
             "other_email": other_email,
             "other_username": other_username,
@@ -638,63 +965,65 @@ def conversation_summaries(user_email: str, db: Session = Depends(get_db)):
             "solution_title": solution_title,
         })
 
-    out.sort(key=lambda x: x["last_timestamp"] or datetime.min, reverse=True)
-    return out
+    return ORJSONResponse(out)
 
 @router.get("/conversations/dm/thread")
 def get_dm_thread(
-    me: str, them: str, limit: int = 50, before: Optional[datetime] = None,
+    response: Response,
+    me: str, them: str, limit: int = Query(50, ge=1, le=200), before: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    a = get_user_by_email(db, me)
-    b = get_user_by_email(db, them)
-    convo = get_or_create_dm_conversation(db, a, b)
+    """
+    `before` takes the "timestamp|id" cursor from next_cursor (also sent as
+    X-Next-Cursor); a bare timestamp still works and pages from that instant.
+    """
+    a, b = get_users_by_emails(db, me, them)
+    convo_id = get_or_create_dm_conversation_id(db, a, b)
 
-    q = db.query(InboxMessage).filter(InboxMessage.conversation_id == convo.id)
-    if before:
-        q = q.filter(InboxMessage.timestamp < before)
-    msgs = q.order_by(InboxMessage.timestamp.desc()).limit(limit).all()
-    msgs.reverse()
+    if before and "|" not in before:
+        before = f"{before}|0"
+    msgs = _seek_messages(db, _CONVO_MESSAGES_WITH_SENDER, {"cid": convo_id}, limit, before,
+                          response)
 
     return {
-        "conversation_id": convo.id,
+        "conversation_id": convo_id,
         "messages": [{
             "id": m.id,
             "content": m.content,
             "timestamp": m.timestamp,
             "read": m.read,
-            "from_email": m.user.email if m.user else None,
-        } for m in msgs]
+            "from_email": m.from_email,
+        } for m in msgs],
+        "next_cursor": response.headers.get("X-Next-Cursor"),
     }
 
-@router.get("/conversations/{conversation_id}/messages")
-def get_conversation_messages(conversation_id: int, db: Session = Depends(get_db)):
-    system_user = get_or_create_system_user(db)
-    msgs = (
-        db.query(InboxMessage)
-          .options(selectinload(InboxMessage.user))
-          .filter(InboxMessage.conversation_id == conversation_id)
-          .order_by(InboxMessage.timestamp.asc())
-          .all()
-    )
+@router.get("/conversations/{conversation_id}/messages", response_class=ORJSONResponse)
+def get_conversation_messages(
+    response: Response,
+    conversation_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    before: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    system_user_id = get_system_user_id(db)
+    msgs = _seek_messages(db, _CONVO_MESSAGES_WITH_SENDER, {"cid": conversation_id}, limit,
+                          before, response)
     out = []
     for m in msgs:
-        from_email = m.user.email if m.user else None
-        from_username = m.user.username if m.user else None
-        if m.user_id == system_user.id:
+        if m.user_id == system_user_id:
             from_display = "System"
         else:
-            from_display = from_username or from_email or "User"
+            from_display = m.from_username or m.from_email or "User"
         out.append({
             "id": m.id,
             "content": m.content,
             "timestamp": m.timestamp,
             "read": m.read,
-            "from_email": from_email,
-            "from_username": from_username,
+            "from_email": m.from_email,
+            "from_username": m.from_username,
             "from_display": from_display,
         })
-    return out
+    return _json_page(out, response)
 
 # ---- Request schema ----
 class ConversationSendIn(BaseModel):
@@ -710,34 +1039,25 @@ def send_to_conversation(conversation_id: int, data: ConversationSendIn, db: Ses
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Ensure sender participates in this conversation
-    is_member = (
-        db.query(ConversationUser)
-        .filter(
-            ConversationUser.conversation_id == conversation_id,
-            ConversationUser.user_id == sender.id,
-        )
-        .first()
-    )
-    if not is_member:
+    if not _is_member(db, conversation_id, sender.id):
         raise HTTPException(status_code=403, detail="Not a participant in this conversation")
 
+    relax_commit_durability(db)
     # Create message
     msg = InboxMessage(
         user_id=sender.id,
         conversation_id=conversation_id,
         content=data.content,
-        timestamp=datetime.utcnow(),
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    db.flush()
 
     # Build a UI-friendly payload (matches /conversations/{id}/messages shape)
     from_email = sender.email
     from_username = sender.username
     from_display = from_username or from_email or "User"
 
-    return {
+    out = {
         "status": "ok",
         "message": {
             "id": msg.id,
@@ -749,6 +1069,8 @@ def send_to_conversation(conversation_id: int, data: ConversationSendIn, db: Ses
             "from_display": from_display,
         },
     }
+    db.commit()
+    return out
 
 class LeaveIn(BaseModel):
     user_email: str
@@ -764,28 +1086,26 @@ def leave_conversation(conversation_id: int, payload: LeaveIn, db: Session = Dep
     if convo.name == f"system:{user.id}":
         raise HTTPException(status_code=400, detail="Cannot leave your System conversation")
 
-    link = (
+    left = (
         db.query(ConversationUser)
         .filter(ConversationUser.conversation_id == conversation_id,
                 ConversationUser.user_id == user.id)
-        .first()
+        .delete(synchronize_session=False)
     )
-    if not link:
+    if not left:
         return {"status": "ok", "message": "not_member"}
 
-    db.delete(link)
     db.commit()
 
     # If no participants remain, clean up the convo + messages
-    still_has_members = (
-        db.query(ConversationUser.id)
-        .filter(ConversationUser.conversation_id == conversation_id)
-        .first()
-    )
+    still_has_members = db.query(
+        exists().where(ConversationUser.conversation_id == conversation_id)
+    ).scalar()
     if not still_has_members:
         db.query(InboxMessage).filter(InboxMessage.conversation_id == conversation_id).delete()
         db.query(Conversation).filter(Conversation.id == conversation_id).delete()
         db.commit()
+        _forget_conversation(conversation_id)
         return {"status": "ok", "message": "left_and_deleted"}
 
     return {"status": "ok", "message": "left"}
@@ -819,53 +1139,25 @@ def admin_delete_conversation(conversation_id: int, user_email: str, db: Session
     db.query(ConversationUser).filter(ConversationUser.conversation_id == conversation_id).delete()
     db.query(Conversation).filter(Conversation.id == conversation_id).delete()
     db.commit()
+    _forget_conversation(conversation_id)
     return {"status": "ok", "message": "deleted"}
 
 @router.get("/ideas/{idea_id}/conversation")
 def get_idea_conversation(idea_id: int, db: Session = Depends(get_db)):
-    convo = get_or_create_idea_conversation(db, idea_id)
+    convo_id = get_or_create_idea_conversation_id(db, idea_id)
     return {
-        "conversation_id": convo.id,
-        "conversation_name": convo.name,                 # e.g., "idea:6"
+        "conversation_id": convo_id,
+        "conversation_name": f"idea:{idea_id}",  # e.g., "idea:6"
         "conversation_title": get_idea_title(db, idea_id)  # human-friendly title
     }
 
 
-@router.get("/ideas/{idea_id}/conversation/messages")
+@router.get("/ideas/{idea_id}/conversation/messages", response_class=ORJSONResponse)
 def get_idea_conversation_messages(idea_id: int, db: Session = Depends(get_db)):
-    system_user = get_or_create_system_user(db)
-    convo = get_or_create_idea_conversation(db, idea_id)
-
-    msgs = (
-        db.query(InboxMessage)
-        .options(selectinload(InboxMessage.user))
-        .filter(InboxMessage.conversation_id == convo.id)
-        .order_by(InboxMessage.timestamp.asc())
-        .all()
-    )
+    system_user_id = get_system_user_id(db)
+    convo_id = get_or_create_idea_conversation_id(db, idea_id)
 
-    def safe_display(m):
-        if m.user_id == system_user.id:
-            return "System"
-        if m.user and getattr(m.user, "username", None):
-            return m.user.username
-        if m.user_id:
-            return f"User {m.user_id}"
-        return "User"
-
-    return [
-        {
-            "id": m.id,
-            "content": m.content,
-            "timestamp": m.timestamp,
-            "read": m.read,
-            "from_username": (m.user.username if m.user else None),
-            "from_user_id": m.user_id,
-            "from_system": (m.user_id == system_user.id),
-            "from_display": safe_display(m),   # ← never email
-        }
-        for m in msgs
-    ]
+    return ORJSONResponse(_thread_messages(db, convo_id, system_user_id))
 
 
 @router.post("/ideas/{idea_id}/conversation/send")
@@ -882,39 +1174,29 @@ def send_to_idea_conversation(
     if not sender:
         raise HTTPException(status_code=401, detail="User not found")
 
-    convo = get_or_create_idea_conversation(db, idea_id)
+    convo_id = get_or_create_idea_conversation_id(db, idea_id)
 
     # Ensure membership so convo shows in sender's feed
-    link = (
-        db.query(ConversationUser)
-        .filter(
-            ConversationUser.conversation_id == convo.id,
-            ConversationUser.user_id == sender.id,
-        )
-        .first()
-    )
-    if not link:
-        db.add(ConversationUser(user_id=sender.id, conversation_id=convo.id))
+    if not _is_member(db, convo_id, sender.id):
+        db.add(ConversationUser(user_id=sender.id, conversation_id=convo_id))
 
     msg = InboxMessage(
         user_id=sender.id,
-        conversation_id=convo.id,
+        conversation_id=convo_id,
         content=(payload.content or "").strip(),
-        timestamp=datetime.utcnow(),
     )
     if not msg.content:
         raise HTTPException(status_code=400, detail="Empty message")
 
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    db.flush()
 
     # Build a privacy-safe display (never email)
     display = sender.username if sender.username else f"User {msg.user_id}"
 
-    return {
+    out = {
         "status": "ok",
-        "conversation_id": convo.id,
+        "conversation_id": convo_id,
         "message": {
             "id": msg.id,
             "content": msg.content,
@@ -925,6 +1207,8 @@ def send_to_idea_conversation(
             "from_display": display,   # ← username or "User <id>", never email
         },
     }
+    db.commit()
+    return out
 
 
 @router.post("/ideas/{idea_id}/conversation/join")
@@ -933,19 +1217,14 @@ def join_idea_conversation(idea_id: int, user_email: str, db: Session = Depends(
     Optional: let users follow an idea thread without sending a message yet.
     """
     user = get_user_by_email(db, user_email)
-    convo = get_or_create_idea_conversation(db, idea_id)
+    convo_id = get_or_create_idea_conversation_id(db, idea_id)
 
-    exists = (
-        db.query(ConversationUser)
-        .filter(ConversationUser.conversation_id == convo.id, ConversationUser.user_id == user.id)
-        .first()
-    )
-    if exists:
-        return {"status": "ok", "message": "already_member", "conversation_id": convo.id}
+    if _is_member(db, convo_id, user.id):
+        return {"status": "ok", "message": "already_member", "conversation_id": convo_id}
 
-    db.add(ConversationUser(user_id=user.id, conversation_id=convo.id))
+    db.add(ConversationUser(user_id=user.id, conversation_id=convo_id))
     db.commit()
-    return {"status": "ok", "message": "joined", "conversation_id": convo.id}
+    return {"status": "ok", "message": "joined", "conversation_id": convo_id}
 
 @router.get("/ideas/{idea_id}/conversation/following")
 def is_following_idea_conversation(idea_id: int, user_email: str, db: Session = Depends(get_db)):
@@ -953,16 +1232,8 @@ def is_following_idea_conversation(idea_id: int, user_email: str, db: Session =
     Return whether the user is a participant of the idea conversation.
     """
     user = get_user_by_email(db, user_email)
-    convo = get_or_create_idea_conversation(db, idea_id)
-    exists = (
-        db.query(ConversationUser.id)
-        .filter(
-            ConversationUser.conversation_id == convo.id,
-            ConversationUser.user_id == user.id,
-        )
-        .first()
-    )
-    return {"conversation_id": convo.id, "following": bool(exists)}
+    convo_id = get_or_create_idea_conversation_id(db, idea_id)
+    return {"conversation_id": convo_id, "following": _is_member(db, convo_id, user.id)}
 
 
 @router.post("/ideas/{idea_id}/conversation/unfollow")
@@ -971,28 +1242,27 @@ def unfollow_idea_conversation(idea_id: int, user_email: str, db: Session = Depe
     Remove the user from the idea conversation participants (their feed won't show it).
     """
     user = get_user_by_email(db, user_email)
-    convo = get_or_create_idea_conversation(db, idea_id)
-    link = (
+    convo_id = get_or_create_idea_conversation_id(db, idea_id)
+    unfollowed = (
         db.query(ConversationUser)
         .filter(
-            ConversationUser.conversation_id == convo.id,
+            ConversationUser.conversation_id == convo_id,
             ConversationUser.user_id == user.id,
         )
-        .first()
+        .delete(synchronize_session=False)
     )
-    if not link:
-        return {"status": "ok", "message": "not_following", "conversation_id": convo.id}
+    if not unfollowed:
+        return {"status": "ok", "message": "not_following", "conversation_id": convo_id}
 
-    db.delete(link)
     db.commit()
-    return {"status": "ok", "message": "unfollowed", "conversation_id": convo.id}
+    return {"status": "ok", "message": "unfollowed", "conversation_id": convo_id}
 
 @router.post("/feedback")
 def receive_feedback(payload: FeedbackIn, request: Request, db: Session = Depends(get_db)):
-    system_user = get_or_create_system_user(db)
+    system_user_id = get_system_user_id(db)
     admin_user = get_or_create_user_by_email_or_create(db, ADMIN_EMAIL, username="Admin")
 
-    convo = get_or_create_feedback_conversation(db, system_user, admin_user)
+    convo_id = get_or_create_feedback_conversation_id(db, system_user_id, admin_user.id)
 
     # Format a readable message
     lines = [
@@ -1010,17 +1280,19 @@ def receive_feedback(payload: FeedbackIn, request: Request, db: Session = Depend
     ]
     content = "\n".join(lines)
 
-    msg = InboxMessage(
-        user_id=system_user.id,            # message appears from System
-        content=content,
-        timestamp=datetime.utcnow(),
-        conversation_id=convo.id,
-    )
-    db.add(msg)
+    message_id = db.execute(
+        insert(InboxMessage)
+        .values(
+            user_id=system_user_id,            # message appears from System
+            content=content,
+            conversation_id=convo_id,
+        )
+        .returning(InboxMessage.id)
+    ).scalar_one()
     db.commit()
-    db.refresh(msg)
+    _remember_named_conversation("feedback", convo_id)
 
-    return {"status": "ok", "message_id": msg.id, "conversation_id": convo.id}
+    return {"status": "ok", "message_id": message_id, "conversation_id": convo_id}
 
 @router.get("/forge/problems/{problem_id}/conversation")
 def get_problem_conversation(problem_id: int, db: Session = Depends(get_db)):
@@ -1031,41 +1303,12 @@ def get_problem_conversation(problem_id: int, db: Session = Depends(get_db)):
         "conversation_title": get_problem_title(db, problem_id),
     }
 
-@router.get("/forge/problems/{problem_id}/conversation/messages")
+@router.get("/forge/problems/{problem_id}/conversation/messages", response_class=ORJSONResponse)
 def get_problem_conversation_messages(problem_id: int, db: Session = Depends(get_db)):
-    system_user = get_or_create_system_user(db)
+    system_user_id = get_system_user_id(db)
     convo = get_or_create_problem_conversation(db, problem_id)
 
-    msgs = (
-        db.query(InboxMessage)
-          .options(selectinload(InboxMessage.user))
-          .filter(InboxMessage.conversation_id == convo.id)
-          .order_by(InboxMessage.timestamp.asc())
-          .all()
-    )
-
-    def safe_display(m):
-        if m.user_id == system_user.id:
-            return "System"
-        if m.user and getattr(m.user, "username", None):
-            return m.user.username
-        if m.user_id:
-            return f"User {m.user_id}"
-        return "User"
-
-    return [
-        {
-            "id": m.id,
-            "content": m.content,
-            "timestamp": m.timestamp,
-            "read": m.read,
-            "from_username": (m.user.username if m.user else None),
-            "from_user_id": m.user_id,
-            "from_system": (m.user_id == system_user.id),
-            "from_display": safe_display(m),
-        }
-        for m in msgs
-    ]
+    return ORJSONResponse(_thread_messages(db, convo.id, system_user_id))
 
 class ProblemSendIn(BaseModel):
     sender_email: str
@@ -1084,13 +1327,7 @@ def send_to_problem_conversation(
     convo = get_or_create_problem_conversation(db, problem_id)
 
     # Ensure membership so it shows in the sender's feed
-    link = (
-        db.query(ConversationUser)
-          .filter(ConversationUser.conversation_id == convo.id,
-                  ConversationUser.user_id == sender.id)
-          .first()
-    )
-    if not link:
+    if not _is_member(db, convo.id, sender.id):
         db.add(ConversationUser(user_id=sender.id, conversation_id=convo.id))
 
     content = (payload.content or "").strip()
@@ -1101,15 +1338,13 @@ def send_to_problem_conversation(
         user_id=sender.id,
         conversation_id=convo.id,
         content=content,
-        timestamp=datetime.utcnow(),
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    db.flush()
 
     display = sender.username if sender.username else f"User {msg.user_id}"
 
-    return {
+    out = {
         "status": "ok",
         "conversation_id": convo.id,
         "message": {
@@ -1122,19 +1357,15 @@ def send_to_problem_conversation(
             "from_display": display,
         },
     }
+    db.commit()
+    return out
 
 @router.post("/forge/problems/{problem_id}/conversation/join")
 def join_problem_conversation(problem_id: int, user_email: str, db: Session = Depends(get_db)):
     user = get_user_by_email(db, user_email)
     convo = get_or_create_problem_conversation(db, problem_id)
 
-    exists = (
-        db.query(ConversationUser)
-          .filter(ConversationUser.conversation_id == convo.id,
-                  ConversationUser.user_id == user.id)
-          .first()
-    )
-    if exists:
+    if _is_member(db, convo.id, user.id):
         return {"status": "ok", "message": "already_member", "conversation_id": convo.id}
 
     db.add(ConversationUser(user_id=user.id, conversation_id=convo.id))
@@ -1145,27 +1376,20 @@ def join_problem_conversation(problem_id: int, user_email: str, db: Session = De
 def is_following_problem_conversation(problem_id: int, user_email: str, db: Session = Depends(get_db)):
     user = get_user_by_email(db, user_email)
     convo = get_or_create_problem_conversation(db, problem_id)
-    exists = (
-        db.query(ConversationUser.id)
-          .filter(ConversationUser.conversation_id == convo.id,
-                  ConversationUser.user_id == user.id)
-          .first()
-    )
-    return {"conversation_id": convo.id, "following": bool(exists)}
+    return {"conversation_id": convo.id, "following": _is_member(db, convo.id, user.id)}
 
 @router.post("/forge/problems/{problem_id}/conversation/unfollow")
 def unfollow_problem_conversation(problem_id: int, user_email: str, db: Session = Depends(get_db)):
     user = get_user_by_email(db, user_email)
     convo = get_or_create_problem_conversation(db, problem_id)
-    link = (
+    unfollowed = (
         db.query(ConversationUser)
           .filter(ConversationUser.conversation_id == convo.id,
                   ConversationUser.user_id == user.id)
-          .first()
+          .delete(synchronize_session=False)
     )
-    if not link:
+    if not unfollowed:
         return {"status": "ok", "message": "not_following", "conversation_id": convo.id}
 
-    db.delete(link)
     db.commit()
     return {"status": "ok", "message": "unfollowed", "conversation_id": convo.id}
\ No newline at end of file
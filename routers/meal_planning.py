@@ -167,6 +167,7 @@ def update_food_inventory(food_data: dict, db: Session = Depends(get_db), curren
                     categories=",".join(item["categories"])
                 )
                 db.add(new_item)
+                inventory_by_name[name] = new_item  # same name later in the payload updates it
                 continue  # skip to next item
 
             # Update existing item
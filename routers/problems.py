@@ -4,10 +4,12 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import math
 
 from database import get_db
+from routers.inbox import get_system_user_id
 from models import (
     Problem, ProblemVote, ProblemFollow,
     User, Conversation, ConversationUser, InboxMessage
@@ -38,17 +40,6 @@ def get_identity_email(x_user_email: Optional[str]) -> str:
     return x_user_email
 
 
-def get_or_create_system_user(db: Session) -> User:
-    sys = db.query(User).filter(User.email == "system@domain.com").first()
-    if sys:
-        return sys
-    sys = User(email="system@domain.com", username="System")
-    db.add(sys)
-    db.commit()
-    db.refresh(sys)
-    return sys
-
-
 def slugify(s: str) -> str:
     import re
     s = s.lower().strip()
@@ -75,8 +66,8 @@ def ensure_problem_conversation(db: Session, problem: Problem, creator_email: Op
     db.add(convo)
     db.flush()  # ensure convo.id
 
-    sys_user = get_or_create_system_user(db)
-    db.add(ConversationUser(user_id=sys_user.id, conversation_id=convo.id))
+    sys_user_id = get_system_user_id(db)
+    db.add(ConversationUser(user_id=sys_user_id, conversation_id=convo.id))
 
     if creator_email and not creator_email.startswith("anon:"):
         user = db.query(User).filter(User.email == creator_email).first()
@@ -85,9 +76,8 @@ def ensure_problem_conversation(db: Session, problem: Problem, creator_email: Op
 
     # optional: seed a welcome message
     db.add(InboxMessage(
-        user_id=sys_user.id,
+        user_id=sys_user_id,
         content=f"New problem created: “{problem.title}”",
-        timestamp=datetime.utcnow(),
         conversation_id=convo.id
     ))
 
@@ -158,8 +148,8 @@ def ensure_solution_conversation(db: Session, solution, creator_email: Optional[
     db.add(convo)
     db.flush()
 
-    sys_user = get_or_create_system_user(db)
-    db.add(ConversationUser(user_id=sys_user.id, conversation_id=convo.id))
+    sys_user_id = get_system_user_id(db)
+    db.add(ConversationUser(user_id=sys_user_id, conversation_id=convo.id))
 
     if creator_email and not (creator_email or "").startswith("anon:"):
         user = db.query(User).filter(User.email == creator_email).first()
@@ -168,9 +158,8 @@ def ensure_solution_conversation(db: Session, solution, creator_email: Optional[
 
     # seed message in the solution convo
     db.add(InboxMessage(
-        user_id=sys_user.id,
+        user_id=sys_user_id,
         content=f"New solution proposed: “{solution.title}”",
-        timestamp=datetime.utcnow(),
         conversation_id=convo.id
     ))
 
@@ -645,11 +634,10 @@ def update_status(
 
     # Announce into the conversation so followers get the update
     if p.conversation_id:
-        sys_user = get_or_create_system_user(db)
+        sys_user_id = get_system_user_id(db)
         db.add(InboxMessage(
-            user_id=sys_user.id,
+            user_id=sys_user_id,
             content=f"Status changed: {old_status} → {new_status}",
-            timestamp=datetime.utcnow(),
             conversation_id=p.conversation_id
         ))
 
@@ -711,32 +699,28 @@ def merge_duplicate(
 
     # --- move conversation participants from dup -> master ---
     if dup.conversation_id and master.conversation_id:
-        uids = [
-            row[0] for row in db.query(ConversationUser.user_id)
-            .filter(ConversationUser.conversation_id == dup.conversation_id).all()
-        ]
-        for uid in set(uids):
-            present = db.query(ConversationUser.id).filter(
-                ConversationUser.user_id == uid,
-                ConversationUser.conversation_id == master.conversation_id
-            ).first()
-            if not present:
-                db.add(ConversationUser(user_id=uid, conversation_id=master.conversation_id))
+        db.execute(
+            pg_insert(ConversationUser)
+            .from_select(
+                ["user_id", "conversation_id"],
+                select(ConversationUser.user_id, literal(master.conversation_id))
+                .where(ConversationUser.conversation_id == dup.conversation_id),
+            )
+            .on_conflict_do_nothing(constraint="uq_conv_user")
+        )
 
     # --- post system messages in both conversations ---
-    sys_user = get_or_create_system_user(db)
+    sys_user_id = get_system_user_id(db)
     if master.conversation_id:
         db.add(InboxMessage(
-            user_id=sys_user.id,
+            user_id=sys_user_id,
             content=f"Merged problem #{dup.id} into this one.",
-            timestamp=datetime.utcnow(),
             conversation_id=master.conversation_id
         ))
     if dup.conversation_id:
         db.add(InboxMessage(
-            user_id=sys_user.id,
+            user_id=sys_user_id,
             content=f"This problem was merged into #{master.id}. Further discussion continues there.",
-            timestamp=datetime.utcnow(),
             conversation_id=dup.conversation_id
         ))
 
@@ -798,11 +782,10 @@ def create_solution(
 
     # announce into the problem conversation
     if p.conversation_id:
-        sys = get_or_create_system_user(db)
+        sys_id = get_system_user_id(db)
         db.add(InboxMessage(
-            user_id=sys.id,
+            user_id=sys_id,
             content=f"New solution proposed for this problem: “{s.title}”",
-            timestamp=datetime.utcnow(),
             conversation_id=p.conversation_id
         ))
         db.commit()
@@ -942,11 +925,10 @@ def update_solution_status(
 
     # announce in its conversation
     if s.conversation_id:
-        sys = get_or_create_system_user(db)
+        sys_id = get_system_user_id(db)
         db.add(InboxMessage(
-            user_id=sys.id,
+            user_id=sys_id,
             content=f"Solution status changed: {old} → {new_status}",
-            timestamp=datetime.utcnow(),
             conversation_id=s.conversation_id
         ))
 
@@ -981,19 +963,17 @@ def accept_solution(
     db.add(s)
 
     # system messages to both convos
-    sys = get_or_create_system_user(db)
+    sys_id = get_system_user_id(db)
     if p.conversation_id:
         db.add(InboxMessage(
-            user_id=sys.id,
+            user_id=sys_id,
             content=f"✅ Accepted solution “{s.title}”. Problem marked Solved.",
-            timestamp=datetime.utcnow(),
             conversation_id=p.conversation_id
         ))
     if s.conversation_id:
         db.add(InboxMessage(
-            user_id=sys.id,
+            user_id=sys_id,
             content=f"✅ This solution was accepted for Problem #{p.id}.",
-            timestamp=datetime.utcnow(),
             conversation_id=s.conversation_id
         ))
 
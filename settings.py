@@ -12,6 +12,16 @@ class Settings(BaseSettings):
 
     # DB
     DATABASE_URL: str
+    # Sync handlers run on AnyIO's worker threads; main.py caps that pool at
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW so a request thread never waits on a
+    # connection that another thread's get_db() cleanup can't release.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30     # seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 3600   # drop connections older than this (server/LB idle cuts)
+    # Compiled-statement LRU per engine. The default 500 is smaller than the
+    # number of distinct statements the routers build; misses recompile.
+    DB_QUERY_CACHE_SIZE: int = 1200
 
     # feature flags
     ENABLE_STRIPE: bool = False